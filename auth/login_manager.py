@@ -1,11 +1,11 @@
 import os
 import bcrypt
 from typing import Optional, Tuple
-from database.db_manager import DBManager
+from database.db_manager import get_db
 from .otp_handler import request_otp, verify_otp
 
 
-db = DBManager()
+db = get_db()
 
 
 class AuthError(Exception):
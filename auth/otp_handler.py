@@ -1,8 +1,127 @@
+import abc
+import heapq
+import logging
+import os
 import random
-from database.db_manager import DBManager
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from database.db_manager import get_db
 from utils.email_service import send_otp_email
 
-db = DBManager()
+# Where one-time codes live (OTP_STORE):
+#   sqlite  the otps table; verification is one indexed read and expired rows are
+#           deleted by a background sweeper every OTP_SWEEP_SECONDS (default)
+#   memory  a dict plus an expiry heap in this process; for single-node deployments
+#           only, since codes are lost on restart and not shared between workers
+
+OTP_STORE = os.getenv('OTP_STORE', 'sqlite')
+OTP_TTL_MINUTES = int(os.getenv('OTP_TTL_MINUTES', '5'))
+OTP_SWEEP_SECONDS = float(os.getenv('OTP_SWEEP_SECONDS', '60'))
+
+db = get_db()
+log = logging.getLogger(__name__)
+
+
+class OTPStore(abc.ABC):
+    @abc.abstractmethod
+    def save(self, email: str, code: str, purpose: str, ttl_minutes: int = OTP_TTL_MINUTES):
+        ...
+
+    @abc.abstractmethod
+    def verify(self, email: str, code: str, purpose: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def sweep(self) -> int:
+        """Drop expired codes; returns how many."""
+
+    def start_sweeper(self, interval: float = OTP_SWEEP_SECONDS):
+        if getattr(self, '_sweeper', None) is not None:
+            return
+        self._stop = threading.Event()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), name='otp-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        if getattr(self, '_sweeper', None) is not None:
+            self._stop.set()
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception:
+                log.exception("otp sweep failed")
+
+
+class SQLiteOTPStore(OTPStore):
+    def __init__(self, db):
+        self.db = db
+
+    def save(self, email: str, code: str, purpose: str, ttl_minutes: int = OTP_TTL_MINUTES):
+        self.db.save_otp(email=email, code=code, purpose=purpose, ttl_minutes=ttl_minutes)
+
+    def verify(self, email: str, code: str, purpose: str) -> bool:
+        return self.db.verify_otp(email=email, code=code, purpose=purpose)
+
+    def sweep(self) -> int:
+        return self.db.cleanup_expired_otps()
+
+
+class MemoryOTPStore(OTPStore):
+    """Codes by (email, purpose), and a heap of expiry times so expired codes are
+    dropped oldest first as new ones are saved (and by the sweeper, if started)."""
+
+    def __init__(self):
+        self._codes: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._expiry: List[Tuple[float, str, str, str]] = []
+        self._lock = threading.Lock()
+
+    def save(self, email: str, code: str, purpose: str, ttl_minutes: int = OTP_TTL_MINUTES):
+        now = time.time()
+        expires = now + ttl_minutes * 60
+        email = email.lower()
+        with self._lock:
+            self._expire(now)
+            self._codes.setdefault((email, purpose), {})[code] = expires
+            heapq.heappush(self._expiry, (expires, email, purpose, code))
+
+    def verify(self, email: str, code: str, purpose: str) -> bool:
+        with self._lock:
+            expires = self._codes.get((email.lower(), purpose), {}).get(code)
+        return expires is not None and time.time() <= expires
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._expire(time.time())
+
+    def _expire(self, now: float) -> int:
+        removed = 0
+        while self._expiry and self._expiry[0][0] < now:
+            expires, email, purpose, code = heapq.heappop(self._expiry)
+            codes = self._codes.get((email, purpose))
+            # The same code may have been issued again since, with a later expiry
+            if codes and codes.get(code) == expires:
+                del codes[code]
+                removed += 1
+                if not codes:
+                    del self._codes[(email, purpose)]
+        return removed
+
+
+def make_otp_store(kind: Optional[str] = None) -> OTPStore:
+    kind = kind or OTP_STORE
+    if kind == 'memory':
+        return MemoryOTPStore()
+    if kind == 'sqlite':
+        return SQLiteOTPStore(db)
+    raise ValueError(f"unknown OTP_STORE: {kind}")
+
+
+otp_store = make_otp_store()
 
 
 def generate_otp(length: int = 6) -> str:
@@ -11,10 +130,10 @@ def generate_otp(length: int = 6) -> str:
 
 def request_otp(email: str, purpose: str = 'login') -> str:
     code = generate_otp()
-    db.save_otp(email=email, code=code, purpose=purpose)
+    otp_store.save(email=email, code=code, purpose=purpose)
     send_otp_email(email, code, purpose)
     return code
 
 
 def verify_otp(email: str, code: str, purpose: str = 'login') -> bool:
-    return db.verify_otp(email=email, code=code, purpose=purpose)
+    return otp_store.verify(email=email, code=code, purpose=purpose)
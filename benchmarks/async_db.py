@@ -0,0 +1,159 @@
+"""Throughput of DB-bound async handlers with queries inline on the event loop vs on AsyncDB's threads.
+
+    python -m benchmarks.async_db                       # in-process, synthetic database
+    python -m benchmarks.async_db --applications 500000 --concurrency 64
+    python -m benchmarks.async_db --url 'http://127.0.0.1:8000/api/jobs?limit=20' --concurrency 64
+
+The in-process mode builds a temporary database, then has --concurrency clients
+send --requests requests each through a handler mix like the portal's (job page,
+ranked applicants page, recruiter stats, an occasional apply) with a little
+non-DB awaiting per request, once with DB_THREADS=0 (the old inline calls) and
+once per --threads value. It reports requests/s, latency percentiles and how
+late a 5 ms timer on the same loop fired (event-loop stalls). SQLite releases
+the GIL while a statement runs, so requests/s scale with cores and with time
+spent waiting on disk or the write lock; on a single core expect the same
+throughput but far smaller loop stalls.
+
+--url runs the same client loop over HTTP against a running single-worker
+uvicorn, e.g. started once with DB_THREADS=0 and once without it.
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.async_db import AsyncDB  # noqa: E402
+from database.db_manager import DBManager  # noqa: E402
+
+
+def build_db(path: str, jobs: int, applications: int, seed: int = 0) -> DBManager:
+    rng = random.Random(seed)
+    db = DBManager(path)
+    conn = db.conn
+    recruiters = [db.create_user(f'Recruiter {i}', f'r{i}@example.com', '!', 'recruiter') for i in range(10)]
+    conn.executemany(
+        'INSERT INTO jobs (recruiter_id, title, description, skills, experience, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+        [(rng.choice(recruiters), f'Job {i}', 'Responsibilities and requirements. ' * 40, 'python, sql', '3 years',
+          f'2025-{1 + i % 12:02d}-{1 + i % 28:02d} 10:00:00') for i in range(jobs)]
+    )
+    conn.executemany(
+        'INSERT INTO applications (job_id, candidate_id, candidate_name, candidate_email, suitability_score, status, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(rng.randint(1, jobs), 1, f'Candidate {i}', f'c{i}@example.com',
+          round(rng.random() * 100, 2) if rng.random() < 0.8 else None, rng.choice(['applied', 'pending', 'hired']),
+          f'2025-{1 + i % 12:02d}-{1 + i % 28:02d} 12:00:00') for i in range(applications)]
+    )
+    conn.commit()
+    return db
+
+
+async def handler(adb: AsyncDB, rng: random.Random, jobs: int):
+    """One request: a query or two plus some non-DB awaiting (parsing the body, other I/O)."""
+    await asyncio.sleep(0.001)
+    kind = rng.random()
+    if kind < 0.4:
+        await adb.list_jobs_page(20)
+    elif kind < 0.7:
+        recruiter = rng.randint(1, 10)
+        page, cursor = await adb.list_ranked_candidates_page(recruiter, 20)
+        if cursor:
+            await adb.list_ranked_candidates_page(recruiter, 20, cursor)
+    elif kind < 0.95:
+        await adb.recruiter_stats(rng.randint(1, 10))
+    else:
+        await adb.apply_to_job(rng.randint(1, jobs), 1, 'Load Test', 'load@example.com', '')
+
+
+async def http_get(url: str):
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    if status != b'200':
+        raise RuntimeError(f'HTTP {status.decode()}')
+
+
+async def load(request, concurrency: int, requests: int):
+    latencies = []
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    async def client(i: int):
+        rng = random.Random(i)
+        for _ in range(requests):
+            start = time.perf_counter()
+            await request(rng)
+            latencies.append(time.perf_counter() - start)
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+    latencies.sort()
+    lags.sort()
+
+    def pct(values, q):
+        return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else 0.0
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': pct(latencies, 0.5), 'p99_ms': pct(latencies, 0.99),
+        'loop_lag_p99_ms': pct(lags, 0.99), 'loop_lag_max_ms': pct(lags, 1.0),
+    }
+
+
+def report(label: str, r: dict):
+    print(f"  {label:14s} {r['rps']:9.1f} req/s   p50 {r['p50_ms']:7.1f} ms   p99 {r['p99_ms']:7.1f} ms   "
+          f"loop lag p99 {r['loop_lag_p99_ms']:6.1f} ms, max {r['loop_lag_max_ms']:6.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--applications', type=int, default=200000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50, help='requests per client')
+    parser.add_argument('--threads', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--url', help='load a running server instead')
+    args = parser.parse_args()
+
+    if args.url:
+        r = asyncio.run(load(lambda rng: http_get(args.url), args.concurrency, args.requests))
+        report(urlsplit(args.url).path, r)
+        return
+
+    tmp = tempfile.mkdtemp()
+    try:
+        print(f"building {args.jobs} jobs / {args.applications} applications ...", file=sys.stderr)
+        db = build_db(os.path.join(tmp, 'bench.db'), args.jobs, args.applications)
+        print(f"{args.concurrency} clients x {args.requests} requests")
+        for threads in [0] + args.threads:
+            adb = AsyncDB(db, threads)
+            r = asyncio.run(load(lambda rng: handler(adb, rng, args.jobs), args.concurrency, args.requests))
+            adb.close()
+            report('inline' if threads == 0 else f'{threads} threads', r)
+        db.close()
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
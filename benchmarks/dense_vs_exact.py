@@ -0,0 +1,107 @@
+"""Recall / latency comparison of the exact TF-IDF matcher and the dense LSA + IVF matcher.
+
+    python -m benchmarks.dense_vs_exact                 # resumes and jobs from the DB
+    python -m benchmarks.dense_vs_exact --synthetic 20000
+
+Reports, per query job:
+  - exact: brute-force sparse TF-IDF top-k (the reference ranking)
+  - dense-flat: brute-force LSA cosine top-k, and its overlap with exact
+  - dense-ivf: IVF ANN top-k, its recall against dense-flat and its overlap with exact
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.dense_matcher import DenseMatcher, IVFIndex  # noqa: E402
+from models.resume_matcher import ResumeMatcher, job_corpus_from_db, resume_corpus_from_db  # noqa: E402
+
+
+def synthetic_corpus(n_resumes: int, n_jobs: int, seed: int = 0):
+    rng = random.Random(seed)
+    topics = [[f"t{t}w{w}" for w in range(40)] for t in range(60)]
+    common = [f"common{w}" for w in range(300)]
+
+    def doc(length):
+        chosen = rng.sample(topics, 3)
+        words = [rng.choice(rng.choice(chosen)) for _ in range(length // 2)]
+        words += [rng.choice(common) for _ in range(length - len(words))]
+        return ' '.join(words)
+
+    return [doc(60) for _ in range(n_jobs)], [doc(rng.randint(150, 400)) for _ in range(n_resumes)]
+
+
+def top_k(scores: np.ndarray, k: int) -> set:
+    k = min(k, len(scores))
+    return set(np.argpartition(-scores, k - 1)[:k].tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synthetic', type=int, default=0, help='generate N synthetic resumes instead of reading the DB')
+    parser.add_argument('--jobs', type=int, default=50, help='number of query jobs (synthetic mode)')
+    parser.add_argument('-k', type=int, default=50)
+    parser.add_argument('--components', type=int, default=128)
+    parser.add_argument('--nprobe', type=int, default=8)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        jobs, resumes = synthetic_corpus(args.synthetic, args.jobs)
+    else:
+        from database.db_manager import DBManager
+        db = DBManager()
+        jobs = job_corpus_from_db(db)
+        resumes = resume_corpus_from_db(db)
+    if not jobs or len(resumes) < 2:
+        sys.exit("Not enough jobs/resumes; try --synthetic 20000")
+
+    exact = ResumeMatcher(model_path=os.devnull).fit(jobs + resumes)
+    t0 = time.perf_counter()
+    dense = DenseMatcher(base=exact, path=os.devnull).fit(jobs + resumes, n_components=args.components)
+    fit_s = time.perf_counter() - t0
+
+    resume_sparse = exact.transform(resumes)
+    resume_dense = dense.embed_weighted(resume_sparse)
+    t0 = time.perf_counter()
+    ids = [str(i) for i in range(len(resumes))]
+    ann = IVFIndex(nprobe=args.nprobe).build(ids, resume_dense)
+    build_s = time.perf_counter() - t0
+
+    timings = {'exact': 0.0, 'dense-flat': 0.0, 'dense-ivf': 0.0}
+    overlap_flat, overlap_ivf, recall_ivf = [], [], []
+    for jd in jobs:
+        t0 = time.perf_counter()
+        exact_scores = exact.similarity(exact.transform([jd]), resume_sparse)[0]
+        ref = top_k(exact_scores, args.k)
+        timings['exact'] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        q = dense.embed([jd])
+        flat = top_k((resume_dense @ q.T).ravel(), args.k)
+        timings['dense-flat'] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        hits = {int(i) for i, _ in ann.search(dense.embed([jd])[0], args.k)}
+        timings['dense-ivf'] += time.perf_counter() - t0
+
+        overlap_flat.append(len(flat & ref) / len(ref))
+        overlap_ivf.append(len(hits & ref) / len(ref))
+        recall_ivf.append(len(hits & flat) / len(flat))
+
+    n = len(jobs)
+    print(f"resumes={len(resumes)} jobs={n} k={args.k} components={dense.components.shape[0]} "
+          f"nlist={len(ann.centroids)} nprobe={args.nprobe}")
+    print(f"LSA fit {fit_s:.2f}s, IVF build {build_s:.2f}s")
+    print(f"{'method':<12}{'ms/query':>10}{'overlap@k vs exact':>22}{'recall@k vs flat':>20}")
+    print(f"{'exact':<12}{timings['exact'] / n * 1000:>10.2f}{1.0:>22.3f}{'-':>20}")
+    print(f"{'dense-flat':<12}{timings['dense-flat'] / n * 1000:>10.2f}{np.mean(overlap_flat):>22.3f}{1.0:>20.3f}")
+    print(f"{'dense-ivf':<12}{timings['dense-ivf'] / n * 1000:>10.2f}{np.mean(overlap_ivf):>22.3f}{np.mean(recall_ivf):>20.3f}")
+
+
+if __name__ == '__main__':
+    main()
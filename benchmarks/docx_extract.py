@@ -0,0 +1,121 @@
+"""Speed / memory comparison of the streaming DOCX extractor and python-docx.
+
+    python -m benchmarks.docx_extract resume1.docx resume2.docx ...
+    python -m benchmarks.docx_extract --synthetic 5000     # paragraphs + tables + header
+
+Reports, per file and method:
+  - median wall time over --repeat runs
+  - peak RSS growth while extracting (measured in a fresh process per method, POSIX only)
+  - characters extracted, and how many distinct words only the streaming extractor found
+    (table cells, headers, footers)
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.docx_extract import extract_docx  # noqa: E402
+
+
+def python_docx_text(path: str) -> str:
+    # The extractor utils/resume_parser.py used before the streaming one
+    import docx
+    return '\n'.join(p.text for p in docx.Document(path).paragraphs)
+
+
+def streaming_text(path: str) -> str:
+    # No character budget, so both methods read the whole document
+    return extract_docx(path, max_chars=sys.maxsize)
+
+
+METHODS = {'python-docx': python_docx_text, 'streaming': streaming_text}
+
+
+def synthetic_docx(paragraphs: int, seed: int = 0) -> str:
+    import docx
+    rng = random.Random(seed)
+    words = [f"word{i}" for i in range(2000)]
+    doc = docx.Document()
+    doc.sections[0].header.paragraphs[0].text = 'Jane Candidate | jane@example.com | headeronly'
+    for i in range(paragraphs):
+        doc.add_paragraph(' '.join(rng.choice(words) for _ in range(rng.randint(8, 40))))
+        if i % 50 == 0:
+            table = doc.add_table(rows=4, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = f"tableonly{rng.randint(0, 500)} " + rng.choice(words)
+    fd, path = tempfile.mkstemp(suffix='.docx')
+    os.close(fd)
+    doc.save(path)
+    return path
+
+
+def measure(method: str, path: str, repeat: int):
+    """Runs in a child process so peak RSS belongs to this method alone."""
+    fn = METHODS[method]
+    if method == 'python-docx':
+        import docx  # noqa: F401  (import cost is not what we measure)
+    try:
+        import resource
+        base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        resource = None
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = fn(path)
+        times.append(time.perf_counter() - start)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base if resource else None
+    if sys.platform == 'darwin' and peak_kb is not None:
+        peak_kb //= 1024  # ru_maxrss is bytes on macOS
+    times.sort()
+    return {'median_ms': times[len(times) // 2] * 1000, 'peak_rss_kb': peak_kb, 'text': text}
+
+
+def run_child(method: str, path: str, repeat: int):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.docx_extract', '--child', method, '--repeat', str(repeat), path],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--synthetic', type=int, default=0, help='generate a DOCX with this many paragraphs')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.files[0], args.repeat)))
+        return
+
+    files = list(args.files)
+    if args.synthetic:
+        files.append(synthetic_docx(args.synthetic))
+    if not files:
+        parser.error('pass DOCX files or --synthetic N')
+
+    for path in files:
+        size_kb = os.path.getsize(path) / 1024
+        print(f"{os.path.basename(path)} ({size_kb:.0f} KB)")
+        results = {m: run_child(m, path, args.repeat) for m in METHODS}
+        for method, r in results.items():
+            rss = f"{r['peak_rss_kb'] / 1024:8.1f} MB" if r['peak_rss_kb'] is not None else '       n/a'
+            print(f"  {method:12s} {r['median_ms']:9.1f} ms  peak +{rss}  {len(r['text']):8d} chars")
+        old_words = set(results['python-docx']['text'].split())
+        new_words = set(results['streaming']['text'].split())
+        print(f"  words only found by streaming: {len(new_words - old_words)}, "
+              f"only by python-docx: {len(old_words - new_words)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from database.db_manager import DBManager
+
+# Awaitable view of a DBManager for async route handlers: db.list_jobs() becomes
+# await adb.list_jobs(). Calls run on a bounded pool of DB_THREADS threads, each
+# with its own WAL connection (ConnectionManager), so a slow query or a commit
+# waiting for the write lock no longer stalls the event loop. At most DB_THREADS
+# queries run at once; further calls wait in the executor queue.
+# DB_THREADS=0 runs every call inline on the event loop (the old behaviour, kept
+# for benchmarks/async_db.py).
+
+DB_THREADS = int(os.getenv('DB_THREADS', '8'))
+
+
+class AsyncDB:
+    def __init__(self, db: DBManager, threads: int = DB_THREADS):
+        self.db = db
+        self.threads = threads
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='db') if threads > 0 else None
+        self._calls: Dict[str, Callable] = {}
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run any blocking callable that uses the database (e.g. auth helpers) on the DB threads."""
+        if self._executor is None:
+            return fn(*args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def __getattr__(self, name: str):
+        call = self._calls.get(name)
+        if call is None:
+            method = getattr(self.db, name)
+            if not callable(method):
+                return method
+
+            @functools.wraps(method)
+            async def call(*args, **kwargs):
+                return await self.run(method, *args, **kwargs)
+            self._calls[name] = call
+        return call
+
+    def close(self):
+        """Wait for queued calls, then stop the threads (their connections close with db.close())."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
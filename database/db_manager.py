@@ -5,12 +5,21 @@ class DBManager:
         self.init_db()
 
     # ...existing code...
+import base64
+import json
 import os
+import re
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'app.db')
+DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', '5'))  # seconds a writer waits for the lock
+DB_CACHE_KB = int(os.getenv('DB_CACHE_KB', '16384'))  # page cache per connection
+DB_MMAP_BYTES = int(os.getenv('DB_MMAP_MB', '256')) * 1024 * 1024
 
 SCHEMA = [
     # users: recruiter or candidate
@@ -63,27 +72,492 @@ SCHEMA = [
         expires_at TIMESTAMP NOT NULL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
     );
+    """,
+    # memoized suitability scores per (job version, resume content hash)
+    """
+    CREATE TABLE IF NOT EXISTS score_cache (
+        job_version TEXT NOT NULL,
+        resume_hash TEXT NOT NULL,
+        score REAL NOT NULL,
+        PRIMARY KEY (job_version, resume_hash)
+    );
+    """,
+    # durable scoring queue: one row per application (re-enqueueing coalesces);
+    # times are unix epoch seconds
+    """
+    CREATE TABLE IF NOT EXISTS scoring_queue (
+        application_id INTEGER PRIMARY KEY,
+        job_id INTEGER NOT NULL,
+        status TEXT CHECK(status IN ('queued','running','done','failed')) NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        enqueued_at REAL NOT NULL,
+        available_at REAL NOT NULL,
+        claimed_at REAL,
+        finished_at REAL
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_scoring_queue_claim ON scoring_queue(status, available_at);
+    """,
+    # registry of every skill named in jobs.skills; ids only grow, so readers can fetch what is new
+    """
+    CREATE TABLE IF NOT EXISTS skills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL
+    );
+    """,
+    # skills found in a resume, and the highest skills.id known when it was scanned
+    """
+    CREATE TABLE IF NOT EXISTS resume_skills (
+        resume_hash TEXT PRIMARY KEY,
+        skills TEXT NOT NULL,
+        max_skill_id INTEGER NOT NULL
+    );
+    """,
+    # content-addressed resume files (utils/blob_store.py); refcount = applications pointing
+    # at path, kept current by the triggers below (resume_path may carry a '::' suffix)
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        size INTEGER NOT NULL,
+        refcount INTEGER NOT NULL DEFAULT 0,
+        stored_at REAL NOT NULL
+    );
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blobs_ref_insert AFTER INSERT ON applications BEGIN
+        UPDATE blobs SET refcount = refcount + 1
+        WHERE path = CASE WHEN instr(NEW.resume_path, '::') > 0
+                          THEN substr(NEW.resume_path, 1, instr(NEW.resume_path, '::') - 1) ELSE NEW.resume_path END;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blobs_ref_delete AFTER DELETE ON applications BEGIN
+        UPDATE blobs SET refcount = refcount - 1
+        WHERE path = CASE WHEN instr(OLD.resume_path, '::') > 0
+                          THEN substr(OLD.resume_path, 1, instr(OLD.resume_path, '::') - 1) ELSE OLD.resume_path END;
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blobs_ref_update AFTER UPDATE OF resume_path ON applications BEGIN
+        UPDATE blobs SET refcount = refcount - 1
+        WHERE path = CASE WHEN instr(OLD.resume_path, '::') > 0
+                          THEN substr(OLD.resume_path, 1, instr(OLD.resume_path, '::') - 1) ELSE OLD.resume_path END;
+        UPDATE blobs SET refcount = refcount + 1
+        WHERE path = CASE WHEN instr(NEW.resume_path, '::') > 0
+                          THEN substr(NEW.resume_path, 1, instr(NEW.resume_path, '::') - 1) ELSE NEW.resume_path END;
+    END;
     """
 ]
 
 
-def get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+# Versioned migrations on top of SCHEMA. PRAGMA user_version records the last one
+# applied; each runs once, in its own transaction, in order.
+JOB_DETAIL_FIELDS = ('company_name', 'type', 'location', 'salary', 'category')
+APPLICATION_DETAIL_FIELDS = ('phone', 'experience', 'skills', 'expected_salary', 'cover_letter')
+
+# Trailing "Label: value" lines the job API used to append to jobs.description
+_PACKED_JOB_LINES = {'Job Type: ': 'type', 'Location: ': 'location', 'Salary: ': 'salary', 'Category: ': 'category'}
+# "<path>::phone:..|exp:..|skills:..|salary:..|cover:.." as once stored in applications.resume_path
+_PACKED_RESUME_RE = re.compile(r'^(.*?)::phone:(.*?)\|exp:(.*?)\|skills:(.*?)\|salary:(.*?)\|cover:(.*)$', re.S)
+
+
+def unpack_job_description(description: str) -> Tuple[str, Dict[str, str]]:
+    """Split a packed description into the plain text and its detail fields."""
+    fields: Dict[str, str] = {}
+    lines = (description or '').split('\n')
+    if lines[0].startswith('Company: '):
+        fields['company_name'] = lines.pop(0)[len('Company: '):].strip()
+    while lines:
+        prefix = next((p for p in _PACKED_JOB_LINES if lines[-1].startswith(p)), None)
+        if prefix is None:
+            break
+        # Edits re-appended the lines; the last occurrence is the newest value
+        fields.setdefault(_PACKED_JOB_LINES[prefix], lines.pop()[len(prefix):].strip())
+    return '\n'.join(lines).strip(), fields
+
+
+def unpack_resume_path(resume_path: str) -> Tuple[str, Dict[str, str]]:
+    m = _PACKED_RESUME_RE.match(resume_path or '')
+    if not m:
+        return resume_path, {}
+    return m.group(1), dict(zip(APPLICATION_DETAIL_FIELDS, m.groups()[1:]))
+
+
+def _migrate_job_details(cur: sqlite3.Cursor):
+    for col in JOB_DETAIL_FIELDS:
+        cur.execute(f'ALTER TABLE jobs ADD COLUMN {col} TEXT')
+    updates = []
+    for row in cur.execute('SELECT id, description FROM jobs').fetchall():
+        description, fields = unpack_job_description(row['description'])
+        if fields:
+            updates.append((description, *(fields.get(c) for c in JOB_DETAIL_FIELDS), row['id']))
+    cur.executemany(
+        f'UPDATE jobs SET description = ?, {", ".join(c + " = ?" for c in JOB_DETAIL_FIELDS)} WHERE id = ?',
+        updates
+    )
+
+
+def _migrate_application_details(cur: sqlite3.Cursor):
+    for col in APPLICATION_DETAIL_FIELDS:
+        cur.execute(f'ALTER TABLE applications ADD COLUMN {col} TEXT')
+    updates = []
+    for row in cur.execute("SELECT id, resume_path FROM applications WHERE resume_path LIKE '%::%'").fetchall():
+        path, fields = unpack_resume_path(row['resume_path'])
+        if fields:
+            updates.append((path, *(fields[c] for c in APPLICATION_DETAIL_FIELDS), row['id']))
+    cur.executemany(
+        f'UPDATE applications SET resume_path = ?, {", ".join(c + " = ?" for c in APPLICATION_DETAIL_FIELDS)} WHERE id = ?',
+        updates
+    )
+
+
+def _migrate_lookup_indexes(cur: sqlite3.Cursor):
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_applications_job ON applications(job_id, created_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_applications_candidate ON applications(candidate_id, created_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_applications_score ON applications(suitability_score)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_jobs_recruiter ON jobs(recruiter_id, created_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_otps_email_purpose ON otps(email, purpose)')
+
+
+def _migrate_keyset_indexes(cur: sqlite3.Cursor):
+    # The rowid (id) is the implicit last column of every index, so these serve
+    # ORDER BY created_at DESC, id DESC and suitability_score DESC, id DESC directly
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)')
+    cur.execute('CREATE INDEX IF NOT EXISTS idx_applications_job_score ON applications(job_id, suitability_score)')
+
+
+def _migrate_job_search(cur: sqlite3.Cursor):
+    # External-content FTS5 index over jobs: the text lives in jobs only, the
+    # triggers keep the index in step with every insert, edit and delete
+    cur.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+        "title, description, skills, content='jobs', content_rowid='id', tokenize='porter unicode61')"
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+            INSERT INTO jobs_fts (rowid, title, description, skills) VALUES (NEW.id, NEW.title, NEW.description, NEW.skills);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, description, skills) VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.skills);
+        END
+        """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, description, skills ON jobs BEGIN
+            INSERT INTO jobs_fts (jobs_fts, rowid, title, description, skills) VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.skills);
+            INSERT INTO jobs_fts (rowid, title, description, skills) VALUES (NEW.id, NEW.title, NEW.description, NEW.skills);
+        END
+        """
+    )
+    cur.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('rebuild')")
+
+
+def _migrate_catalog_versions(cur: sqlite3.Cursor):
+    # Change counters for in-process caches of whole tables (database/job_catalog.py):
+    # bumped by triggers, so writes from any process or connection are seen
+    cur.execute('CREATE TABLE IF NOT EXISTS catalog_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+    cur.execute("INSERT OR IGNORE INTO catalog_versions (name, version) VALUES ('jobs', 0)")
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS jobs_version_{event.lower()} AFTER {event} ON jobs BEGIN
+                UPDATE catalog_versions SET version = version + 1 WHERE name = 'jobs';
+            END
+            """
+        )
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, 'job detail columns', _migrate_job_details),
+    (2, 'application detail columns', _migrate_application_details),
+    (3, 'lookup indexes', _migrate_lookup_indexes),
+    (4, 'keyset pagination indexes', _migrate_keyset_indexes),
+    (5, 'job full-text search', _migrate_job_search),
+    (6, 'catalog version counters', _migrate_catalog_versions),
+]
+
+# Hot queries and the index each must use; check_query_plans() reports any that fall back to a scan
+QUERY_PLAN_CHECKS = [
+    ('applicants of a job', 'SELECT * FROM applications WHERE job_id = ? ORDER BY created_at DESC', (1,), 'idx_applications_job'),
+    ('applications of a candidate',
+     'SELECT a.*, j.title FROM applications a JOIN jobs j ON j.id = a.job_id WHERE a.candidate_id = ? ORDER BY a.created_at DESC',
+     (1,), 'idx_applications_candidate'),
+    ('jobs of a recruiter', 'SELECT * FROM jobs WHERE recruiter_id = ? ORDER BY created_at DESC', (1,), 'idx_jobs_recruiter'),
+    ('recruiter stats',
+     'SELECT j.id, a.status, COUNT(a.id) FROM jobs j LEFT JOIN applications a ON a.job_id = j.id WHERE j.recruiter_id = ? GROUP BY j.id, a.status',
+     (1,), 'idx_applications_job'),
+    ('best scored applications', 'SELECT id FROM applications WHERE suitability_score IS NOT NULL ORDER BY suitability_score DESC LIMIT 50',
+     (), 'idx_applications_score'),
+    ('otp lookup', 'SELECT 1 FROM otps WHERE email = ? AND purpose = ? AND code = ? AND expires_at >= ? LIMIT 1',
+     ('a@example.com', 'login', '000000', '2000-01-01'), 'idx_otps_email_purpose'),
+    ('job page', 'SELECT id FROM jobs WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT 20',
+     ('9999', 0), 'idx_jobs_created'),
+    ('applicant page',
+     'SELECT id FROM applications WHERE job_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT 20',
+     (1, '9999', 0), 'idx_applications_job'),
+    ('ranked applicant page',
+     'SELECT id FROM applications WHERE job_id = ? AND suitability_score IS NOT NULL AND (suitability_score, id) < (?, ?) '
+     'ORDER BY suitability_score DESC, id DESC LIMIT 20',
+     (1, 100.0, 0), 'idx_applications_job_score'),
+    ('job search', "SELECT j.id FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid WHERE jobs_fts MATCH ? ORDER BY bm25(jobs_fts)",
+     ('"python"*',), 'jobs_fts VIRTUAL TABLE'),
+]
+
+# Named column sets for list views; 'summary' leaves out the long text columns.
+# A comma-separated list of columns from the 'full' set is accepted as well.
+JOB_FIELD_SETS = {
+    'summary': ('id', 'recruiter_id', 'title', 'skills', 'experience', 'created_at') + JOB_DETAIL_FIELDS,
+    'full': ('id', 'recruiter_id', 'title', 'description', 'skills', 'experience', 'created_at') + JOB_DETAIL_FIELDS,
+}
+APPLICATION_FIELD_SETS = {
+    'summary': ('id', 'job_id', 'candidate_id', 'candidate_name', 'candidate_email', 'suitability_score', 'status', 'created_at'),
+    'full': ('id', 'job_id', 'candidate_id', 'candidate_name', 'candidate_email', 'suitability_score', 'status', 'created_at',
+             'resume_path') + APPLICATION_DETAIL_FIELDS,
+}
+
+
+def _projection(field_sets: Dict[str, Tuple[str, ...]], fields: str, alias: str, required: Tuple[str, ...]) -> str:
+    """SELECT list for a named field set or column list; always includes the keyset columns."""
+    if fields in field_sets:
+        columns = list(field_sets[fields])
+    else:
+        columns = [c.strip() for c in (fields or '').split(',') if c.strip()]
+        unknown = [c for c in columns if c not in field_sets['full']]
+        if unknown or not columns:
+            raise ValueError(f'unknown fields: {fields}')
+    columns += [c for c in required if c not in columns]
+    return ', '.join(f'{alias}.{c}' for c in columns)
+
+
+# Column weights for bm25() over jobs_fts (title, description, skills)
+JOB_SEARCH_WEIGHTS = (10.0, 1.0, 5.0)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, as a prefix
+    ("pyth dev" finds "Python developer"). None when there is nothing to search."""
+    words = re.findall(r'\w+', (text or '').lower())
+    return ' '.join(f'"{w}"*' for w in words) or None
+
+
+def _job_filters(location: Optional[str], category: Optional[str], job_type: Optional[str]) -> Tuple[List[str], list]:
+    where, params = [], []
+    if location:
+        where.append("j.location LIKE '%' || ? || '%'")
+        params.append(location)
+    if category:
+        where.append('j.category = ? COLLATE NOCASE')
+        params.append(category)
+    if job_type:
+        where.append('j.type = ? COLLATE NOCASE')
+        params.append(job_type)
+    return where, params
+
+
+# Opaque keyset cursors: the sort key of the last row of a page, e.g. (created_at, id)
+def encode_cursor(*key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int = 2) -> list:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('invalid cursor')
+    if not isinstance(key, list) or len(key) != size:
+        raise ValueError('invalid cursor')
+    return key
+
+
+def _page(rows: List[sqlite3.Row], limit: int, key: Tuple[str, str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Rows fetched with LIMIT limit + 1 -> (page, cursor of the next page or None)."""
+    page = [dict(r) for r in rows[:limit]]
+    more = len(rows) > limit
+    return page, encode_cursor(*(page[-1][k] for k in key)) if more else None
+
+
+def normalize_skill(text: str) -> str:
+    return re.sub(r'\s+', ' ', (text or '').lower()).strip()
+
+
+def split_skill_list(skills: str) -> List[str]:
+    """Skill names from a comma/semicolon/pipe/newline separated list, lowercased with
+    whitespace collapsed; the one splitter for the registry and the skill matcher."""
+    return [s for s in (normalize_skill(p) for p in re.split(r'[,;|\n]+', skills or '')) if s]
+
+
+# Callbacks fired as fn(event, job_id) after a job is created, updated or deleted,
+# so in-process caches derived from the jobs table can drop stale entries.
+_job_listeners: List[Callable[[str, int], None]] = []
+
+
+def add_job_listener(fn: Callable[[str, int], None]):
+    _job_listeners.append(fn)
+
+
+def _notify_job_change(event: str, job_id: int):
+    for fn in _job_listeners:
+        fn(event, job_id)
+
+
+def get_conn(path: Optional[str] = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(path or DB_PATH, timeout=DB_BUSY_TIMEOUT, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # WAL lets readers run while a writer commits; NORMAL sync is durable across
+    # application crashes (only an OS crash can lose the last commits)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA busy_timeout={int(DB_BUSY_TIMEOUT * 1000)}')
+    conn.execute(f'PRAGMA cache_size=-{DB_CACHE_KB}')
+    conn.execute(f'PRAGMA mmap_size={DB_MMAP_BYTES}')
+    conn.execute('PRAGMA temp_store=MEMORY')
     return conn
 
 
+class ConnectionManager:
+    """Hands each thread its own connection to one database file.
+
+    sqlite3 connections must not be used from two threads at once; with one
+    connection per thread (event loop, asyncio.to_thread workers, scoring worker)
+    reads proceed in parallel under WAL and only writers take turns."""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all: List[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # A forked child must not reuse its parent's connection
+        if conn is None or self._local.pid != os.getpid():
+            conn = get_conn(self.path)
+            self._local.conn, self._local.pid = conn, os.getpid()
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
 class DBManager:
-    def __init__(self):
-        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        self.conn = get_conn()
+    def __init__(self, path: Optional[str] = None):
+        path = path or DB_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connections = ConnectionManager(path)
+        self._tx = threading.local()
         self.init_db()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The calling thread's connection."""
+        return self.connections.connection()
+
+    def close(self):
+        self.connections.close_all()
+
+    @contextmanager
+    def transaction(self):
+        """Unit of work: writes made by any DBManager method inside the block commit once
+        at the end, or roll back together on an exception. Nested blocks join the outer one.
+
+        Takes the write lock up front (BEGIN IMMEDIATE), so a read-then-write inside the
+        block can't fail halfway with SQLITE_BUSY; keep slow work (parsing, scoring) outside."""
+        tx = self._tx
+        if getattr(tx, 'depth', 0):
+            tx.depth += 1
+            try:
+                yield self.conn
+            finally:
+                tx.depth -= 1
+            return
+        conn = self.conn
+        conn.commit()
+        conn.execute('BEGIN IMMEDIATE')
+        tx.depth, tx.after = 1, []
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            tx.depth = 0
+            after, tx.after = tx.after, []
+        for fn, args in after:
+            fn(*args)
+
+    def _commit(self):
+        """Commit a method's writes, unless a transaction() commits them later."""
+        if not getattr(self._tx, 'depth', 0):
+            self.conn.commit()
+
+    def _after_commit(self, fn: Callable, *args):
+        if getattr(self._tx, 'depth', 0):
+            self._tx.after.append((fn, args))
+        else:
+            fn(*args)
+
     def init_db(self):
         cur = self.conn.cursor()
         for stmt in SCHEMA:
             cur.execute(stmt)
+        if cur.execute('SELECT COUNT(*) FROM skills').fetchone()[0] == 0:
+            for row in cur.execute('SELECT skills FROM jobs').fetchall():
+                self._register_skills(cur, row['skills'])
         self.conn.commit()
+        self.migrate()
+
+    def migrate(self) -> int:
+        """Apply pending MIGRATIONS; returns how many ran."""
+        conn = self.conn
+        cur = conn.cursor()
+        applied = 0
+        for version, _, fn in MIGRATIONS:
+            if cur.execute('PRAGMA user_version').fetchone()[0] >= version:
+                continue
+            cur.execute('BEGIN IMMEDIATE')
+            try:
+                # Another process may have applied it while we waited for the lock
+                if cur.execute('PRAGMA user_version').fetchone()[0] < version:
+                    fn(cur)
+                    cur.execute(f'PRAGMA user_version = {version}')
+                    applied += 1
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return applied
+
+    def check_query_plans(self) -> List[str]:
+        """Hot queries whose plan no longer uses the expected index."""
+        cur = self.conn.cursor()
+        problems = []
+        for name, sql, params, index in QUERY_PLAN_CHECKS:
+            plan = ' | '.join(r['detail'] for r in cur.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall())
+            if index not in plan:
+                problems.append(f'{name}: expected {index}, plan was: {plan}')
+        return problems
+
+    def _register_skills(self, cur: sqlite3.Cursor, skills: str):
+        cur.executemany('INSERT OR IGNORE INTO skills (name) VALUES (?)', [(s,) for s in split_skill_list(skills)])
 
     # Users
     def create_user(self, name: str, email: str, password_hash: str, role: str) -> int:
@@ -92,7 +566,7 @@ class DBManager:
             'INSERT INTO users (name, email, password_hash, role) VALUES (?,?,?,?)',
             (name, email.lower(), password_hash, role)
         )
-        self.conn.commit()
+        self._commit()
         return cur.lastrowid
 
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
@@ -115,34 +589,35 @@ class DBManager:
             'INSERT INTO otps (email, code, purpose, expires_at) VALUES (?,?,?,?)',
             (email.lower(), code, purpose, expires_at.isoformat())
         )
-        self.conn.commit()
+        self._commit()
 
     def verify_otp(self, email: str, code: str, purpose: str) -> bool:
-        self.cleanup_expired_otps()
+        """One indexed read; expired rows are deleted by cleanup_expired_otps() from a sweeper."""
         cur = self.conn.cursor()
         cur.execute(
-            'SELECT * FROM otps WHERE email = ? AND code = ? AND purpose = ? ORDER BY created_at DESC LIMIT 1',
-            (email.lower(), code, purpose)
+            'SELECT 1 FROM otps WHERE email = ? AND purpose = ? AND code = ? AND expires_at >= ? LIMIT 1',
+            (email.lower(), purpose, code, datetime.utcnow().isoformat())
         )
-        row = cur.fetchone()
-        if not row:
-            return False
-        expires_at = datetime.fromisoformat(row['expires_at'])
-        return datetime.utcnow() <= expires_at
+        return cur.fetchone() is not None
 
-    def cleanup_expired_otps(self):
+    def cleanup_expired_otps(self) -> int:
         cur = self.conn.cursor()
         cur.execute('DELETE FROM otps WHERE expires_at < ?', (datetime.utcnow().isoformat(),))
-        self.conn.commit()
+        self._commit()
+        return cur.rowcount
 
     # Jobs
-    def create_job(self, recruiter_id: int, title: str, description: str, skills: str, experience: str) -> int:
+    def create_job(self, recruiter_id: int, title: str, description: str, skills: str, experience: str,
+                   company_name: str = '', job_type: str = '', location: str = '', salary: str = '', category: str = '') -> int:
         cur = self.conn.cursor()
         cur.execute(
-            'INSERT INTO jobs (recruiter_id, title, description, skills, experience) VALUES (?,?,?,?,?)',
-            (recruiter_id, title, description, skills, experience)
+            'INSERT INTO jobs (recruiter_id, title, description, skills, experience, company_name, type, location, salary, category) '
+            'VALUES (?,?,?,?,?,?,?,?,?,?)',
+            (recruiter_id, title, description, skills, experience, company_name, job_type, location, salary, category)
         )
-        self.conn.commit()
+        self._register_skills(cur, skills)
+        self._commit()
+        self._after_commit(_notify_job_change, 'created', cur.lastrowid)
         return cur.lastrowid
 
     def list_jobs(self) -> List[Dict[str, Any]]:
@@ -151,41 +626,383 @@ class DBManager:
         rows = cur.fetchall()
         return [dict(r) for r in rows]
 
+    def get_job_by_id(self, job_id: int) -> Optional[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute('SELECT j.*, u.name as recruiter_name FROM jobs j JOIN users u ON u.id = j.recruiter_id WHERE j.id = ?', (job_id,))
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    def catalog_version(self, name: str) -> int:
+        """Change counter of a cached table ('jobs'), bumped by triggers on every write."""
+        row = self.conn.execute('SELECT version FROM catalog_versions WHERE name = ?', (name,)).fetchone()
+        return row['version'] if row else 0
+
     def list_jobs_by_recruiter(self, recruiter_id: int) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
         cur.execute('SELECT * FROM jobs WHERE recruiter_id = ? ORDER BY created_at DESC', (recruiter_id,))
         rows = cur.fetchall()
         return [dict(r) for r in rows]
 
-    def update_job(self, job_id: int, recruiter_id: int, title: str, description: str, skills: str, experience: str) -> bool:
+    # Keyset-paged listings: pass the returned cursor back to get the next page; the
+    # cost of a page does not depend on how deep into the list it is.
+    def list_jobs_page(self, limit: int = 20, cursor: Optional[str] = None, fields: str = 'summary',
+                       location: Optional[str] = None, category: Optional[str] = None,
+                       job_type: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        cols = _projection(JOB_FIELD_SETS, fields, 'j', ('id', 'created_at'))
+        where, params = _job_filters(location, category, job_type)
+        if cursor:
+            where.append('(j.created_at, j.id) < (?, ?)')
+            params += decode_cursor(cursor)
         cur = self.conn.cursor()
         cur.execute(
-            'UPDATE jobs SET title = ?, description = ?, skills = ?, experience = ? WHERE id = ? AND recruiter_id = ?',
-            (title, description, skills, experience, job_id, recruiter_id)
+            f'''
+            SELECT {cols}, u.name AS recruiter_name
+            FROM jobs j JOIN users u ON u.id = j.recruiter_id
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY j.created_at DESC, j.id DESC LIMIT ?
+            ''',
+            (*params, limit + 1)
         )
-        self.conn.commit()
-        return cur.rowcount > 0
+        return _page(cur.fetchall(), limit, ('created_at', 'id'))
+
+    def search_jobs(self, q: str = '', location: Optional[str] = None, category: Optional[str] = None,
+                    job_type: Optional[str] = None, limit: int = 20, cursor: Optional[str] = None,
+                    fields: str = 'summary') -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Full-text search over title, description and skills (jobs_fts), best BM25 match
+        first, keyset-paged on (relevance, id). Without search terms: newest jobs first."""
+        match = fts_query(q)
+        if match is None:
+            return self.list_jobs_page(limit, cursor, fields, location, category, job_type)
+        cols = _projection(JOB_FIELD_SETS, fields, 'j', ('id',))
+        where, params = _job_filters(location, category, job_type)
+        keyset, key_params = '', []
+        if cursor:
+            keyset, key_params = 'WHERE (relevance, id) < (?, ?)', decode_cursor(cursor)
+        cur = self.conn.cursor()
+        # bm25() is lower-is-better; relevance flips it so pages run high to low like every other cursor
+        cur.execute(
+            f'''
+            SELECT * FROM (
+                SELECT {cols}, u.name AS recruiter_name, -bm25(jobs_fts, {', '.join(map(str, JOB_SEARCH_WEIGHTS))}) AS relevance
+                FROM jobs_fts
+                JOIN jobs j ON j.id = jobs_fts.rowid
+                JOIN users u ON u.id = j.recruiter_id
+                WHERE jobs_fts MATCH ?{''.join(' AND ' + w for w in where)}
+            ) {keyset}
+            ORDER BY relevance DESC, id DESC LIMIT ?
+            ''',
+            (match, *params, *key_params, limit + 1)
+        )
+        return _page(cur.fetchall(), limit, ('relevance', 'id'))
+
+    def update_job(self, job_id: int, recruiter_id: int, title: str, description: str, skills: str, experience: str,
+                   company_name: Optional[str] = None, job_type: Optional[str] = None, location: Optional[str] = None,
+                   salary: Optional[str] = None, category: Optional[str] = None) -> bool:
+        """Detail fields left as None keep their current value."""
+        cur = self.conn.cursor()
+        cur.execute(
+            '''
+            UPDATE jobs SET title = ?, description = ?, skills = ?, experience = ?,
+                   company_name = COALESCE(?, company_name), type = COALESCE(?, type), location = COALESCE(?, location),
+                   salary = COALESCE(?, salary), category = COALESCE(?, category)
+            WHERE id = ? AND recruiter_id = ?
+            ''',
+            (title, description, skills, experience, company_name, job_type, location, salary, category, job_id, recruiter_id)
+        )
+        updated = cur.rowcount > 0
+        if updated:
+            self._register_skills(cur, skills)
+        self._commit()
+        if updated:
+            self._after_commit(_notify_job_change, 'updated', job_id)
+        return updated
 
     def delete_job(self, job_id: int, recruiter_id: int) -> bool:
         cur = self.conn.cursor()
         cur.execute('DELETE FROM jobs WHERE id = ? AND recruiter_id = ?', (job_id, recruiter_id))
-        self.conn.commit()
-        return cur.rowcount > 0
+        self._commit()
+        deleted = cur.rowcount > 0
+        if deleted:
+            self._after_commit(_notify_job_change, 'deleted', job_id)
+        return deleted
+
+    # Skills
+    def list_skills_since(self, after_id: int) -> List[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute('SELECT id, name FROM skills WHERE id > ? ORDER BY id', (after_id,))
+        return [dict(r) for r in cur.fetchall()]
+
+    def get_skill_ids(self, names: List[str]) -> Dict[str, int]:
+        if not names:
+            return {}
+        cur = self.conn.cursor()
+        marks = ','.join('?' * len(names))
+        cur.execute(f'SELECT id, name FROM skills WHERE name IN ({marks})', names)
+        return {r['name']: r['id'] for r in cur.fetchall()}
+
+    def get_resume_skills(self, resume_hashes: List[str]) -> Dict[str, Tuple[set, int]]:
+        cur = self.conn.cursor()
+        found = {}
+        for i in range(0, len(resume_hashes), 500):
+            chunk = resume_hashes[i:i + 500]
+            marks = ','.join('?' * len(chunk))
+            cur.execute(f'SELECT * FROM resume_skills WHERE resume_hash IN ({marks})', chunk)
+            for r in cur.fetchall():
+                found[r['resume_hash']] = (set(filter(None, r['skills'].split('\n'))), r['max_skill_id'])
+        return found
+
+    def save_resume_skills(self, resume_hash: str, skills: set, max_skill_id: int):
+        cur = self.conn.cursor()
+        cur.execute(
+            'INSERT OR REPLACE INTO resume_skills (resume_hash, skills, max_skill_id) VALUES (?,?,?)',
+            (resume_hash, '\n'.join(sorted(skills)), max_skill_id)
+        )
+        self._commit()
 
     # Applications
-    def apply_to_job(self, job_id: int, candidate_id: int, candidate_name: str, candidate_email: str, resume_path: str) -> int:
+    def apply_to_job(self, job_id: int, candidate_id: int, candidate_name: str, candidate_email: str, resume_path: str,
+                     phone: str = '', experience: str = '', skills: str = '', expected_salary: str = '', cover_letter: str = '') -> int:
         cur = self.conn.cursor()
         cur.execute(
-            'INSERT INTO applications (job_id, candidate_id, candidate_name, candidate_email, resume_path) VALUES (?,?,?,?,?)',
-            (job_id, candidate_id, candidate_name, candidate_email, resume_path)
+            'INSERT INTO applications (job_id, candidate_id, candidate_name, candidate_email, resume_path, '
+            'phone, experience, skills, expected_salary, cover_letter) VALUES (?,?,?,?,?,?,?,?,?,?)',
+            (job_id, candidate_id, candidate_name, candidate_email, resume_path, phone, experience, skills, expected_salary, cover_letter)
         )
-        self.conn.commit()
+        self._commit()
         return cur.lastrowid
 
+    # Bulk import (utils/bulk_ingest.py)
+    def get_or_create_candidates(self, people: List[Tuple[str, str]]) -> Dict[str, int]:
+        """Map email -> user id for (name, email) pairs, creating candidate accounts
+        that cannot log in with a password. Emails owned by recruiters are left out."""
+        cur = self.conn.cursor()
+        out = {}
+        with self.transaction():
+            for name, email in people:
+                email = email.lower()
+                if email in out:
+                    continue
+                cur.execute('SELECT id, role FROM users WHERE email = ?', (email,))
+                row = cur.fetchone()
+                if row is None:
+                    cur.execute(
+                        "INSERT INTO users (name, email, password_hash, role) VALUES (?,?,'!','candidate')",
+                        (name or email, email)
+                    )
+                    out[email] = cur.lastrowid
+                elif row['role'] == 'candidate':
+                    out[email] = row['id']
+        return out
+
+    def existing_applications(self, keys: List[Tuple[int, int, str]]) -> set:
+        """Which (job_id, candidate_id, resume_path) triples already have an application."""
+        cur = self.conn.cursor()
+        found = set()
+        for job_id, candidate_id, resume_path in keys:
+            cur.execute(
+                'SELECT 1 FROM applications WHERE job_id = ? AND candidate_id = ? AND resume_path = ? LIMIT 1',
+                (job_id, candidate_id, resume_path)
+            )
+            if cur.fetchone():
+                found.add((job_id, candidate_id, resume_path))
+        return found
+
+    _APPLICATION_INSERT_FIELDS = ('job_id', 'candidate_id', 'candidate_name', 'candidate_email', 'resume_path',
+                                  'suitability_score', 'status') + APPLICATION_DETAIL_FIELDS
+
+    def insert_applications(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Insert many applications with one executemany in one transaction; returns their ids
+        in order. Missing keys take the column default ('' for the detail fields)."""
+        if not rows:
+            return []
+        fields = self._APPLICATION_INSERT_FIELDS
+        defaults = {**dict.fromkeys(APPLICATION_DETAIL_FIELDS, ''), 'suitability_score': None, 'status': 'applied'}
+        cur = self.conn.cursor()
+        with self.transaction():
+            cur.executemany(
+                f"INSERT INTO applications ({', '.join(fields)}) VALUES ({','.join('?' * len(fields))})",
+                [tuple(r.get(f, defaults.get(f)) for f in fields) for r in rows]
+            )
+            # executemany leaves no lastrowid; under the write lock AUTOINCREMENT
+            # hands out consecutive ids, ending at the table's sequence value
+            last = cur.execute("SELECT seq FROM sqlite_sequence WHERE name = 'applications'").fetchone()['seq']
+        return list(range(last - len(rows) + 1, last + 1))
+
     def set_application_score(self, application_id: int, score: float):
+        self.set_application_scores([(application_id, score)])
+
+    def set_application_scores(self, scores: List[Tuple[int, float]]):
+        """(application_id, score) pairs in one statement batch."""
         cur = self.conn.cursor()
-        cur.execute('UPDATE applications SET suitability_score = ? WHERE id = ?', (float(score), application_id))
-        self.conn.commit()
+        cur.executemany('UPDATE applications SET suitability_score = ? WHERE id = ?', [(float(s), i) for i, s in scores])
+        self._commit()
+
+    def update_application_statuses(self, statuses: List[Tuple[int, str]]) -> int:
+        """(application_id, status) pairs; returns how many applications were updated."""
+        cur = self.conn.cursor()
+        cur.executemany('UPDATE applications SET status = ? WHERE id = ?', [(s, i) for i, s in statuses])
+        self._commit()
+        return cur.rowcount
+
+    def get_cached_scores(self, job_version: str, resume_hashes: List[str]) -> Dict[str, float]:
+        cur = self.conn.cursor()
+        found = {}
+        for i in range(0, len(resume_hashes), 500):
+            chunk = resume_hashes[i:i + 500]
+            marks = ','.join('?' * len(chunk))
+            cur.execute(
+                f'SELECT resume_hash, score FROM score_cache WHERE job_version = ? AND resume_hash IN ({marks})',
+                (job_version, *chunk)
+            )
+            found.update({r['resume_hash']: r['score'] for r in cur.fetchall()})
+        return found
+
+    def cache_scores(self, job_version: str, scores: Dict[str, float]):
+        cur = self.conn.cursor()
+        cur.executemany(
+            'INSERT OR REPLACE INTO score_cache (job_version, resume_hash, score) VALUES (?,?,?)',
+            [(job_version, h, float(v)) for h, v in scores.items()]
+        )
+        self._commit()
+
+    # Scoring queue
+    _ENQUEUE_SQL = '''
+        INSERT INTO scoring_queue (application_id, job_id, status, attempts, enqueued_at, available_at)
+        VALUES (?, ?, 'queued', 0, ?, ?)
+        ON CONFLICT(application_id) DO UPDATE SET
+            job_id = excluded.job_id,
+            attempts = CASE WHEN status = 'queued' THEN attempts ELSE 0 END,
+            enqueued_at = CASE WHEN status = 'queued' THEN enqueued_at ELSE excluded.enqueued_at END,
+            available_at = CASE WHEN status = 'queued' THEN available_at ELSE excluded.available_at END,
+            status = 'queued',
+            last_error = NULL
+    '''
+
+    def enqueue_scoring(self, items: List[Tuple[int, int]]):
+        """Queue (application_id, job_id) pairs; an application already queued stays one entry."""
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.executemany(self._ENQUEUE_SQL, [(app_id, job_id, now, now) for app_id, job_id in items])
+        self._commit()
+
+    def enqueue_job_rescore(self, job_id: int) -> int:
+        cur = self.conn.cursor()
+        cur.execute('SELECT id FROM applications WHERE job_id = ?', (job_id,))
+        items = [(r['id'], job_id) for r in cur.fetchall()]
+        self.enqueue_scoring(items)
+        return len(items)
+
+    def recover_scoring_queue(self, lease_seconds: float) -> int:
+        """Requeue claims whose worker died, and queue applications that never got a score."""
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.execute(
+            "UPDATE scoring_queue SET status = 'queued', available_at = ? WHERE status = 'running' AND claimed_at < ?",
+            (now, now - lease_seconds)
+        )
+        requeued = cur.rowcount
+        cur.execute(
+            '''
+            INSERT OR IGNORE INTO scoring_queue (application_id, job_id, enqueued_at, available_at)
+            SELECT a.id, a.job_id, ?, ? FROM applications a WHERE a.suitability_score IS NULL
+            ''',
+            (now, now)
+        )
+        requeued += cur.rowcount
+        self._commit()
+        return requeued
+
+    def claim_scoring_batch(self, limit: int) -> List[Dict[str, Any]]:
+        """Atomically mark up to limit due entries as running and return them with
+        the application rows they refer to."""
+        now = time.time()
+        cur = self.conn.cursor()
+        with self.transaction():
+            cur.execute(
+                "SELECT application_id FROM scoring_queue WHERE status = 'queued' AND available_at <= ? ORDER BY enqueued_at LIMIT ?",
+                (now, limit)
+            )
+            ids = [r['application_id'] for r in cur.fetchall()]
+            cur.executemany(
+                "UPDATE scoring_queue SET status = 'running', attempts = attempts + 1, claimed_at = ? WHERE application_id = ?",
+                [(now, i) for i in ids]
+            )
+        if not ids:
+            return []
+        marks = ','.join('?' * len(ids))
+        cur.execute(
+            f'''
+            SELECT q.application_id, q.job_id, q.attempts, a.candidate_id, a.candidate_name, a.candidate_email, a.resume_path
+            FROM scoring_queue q JOIN applications a ON a.id = q.application_id
+            WHERE q.application_id IN ({marks})
+            ''',
+            ids
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def complete_scoring(self, application_ids: List[int]):
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.executemany(
+            "UPDATE scoring_queue SET status = 'done', finished_at = ?, last_error = NULL WHERE application_id = ? AND status = 'running'",
+            [(now, i) for i in application_ids]
+        )
+        self._commit()
+
+    def fail_scoring(self, application_ids: List[int], error: str, max_attempts: int, backoff_seconds: float):
+        """Retry with exponential backoff, or give up after max_attempts."""
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.executemany(
+            '''
+            UPDATE scoring_queue SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                available_at = ? + ? * (1 << MIN(attempts, 10)),
+                finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END,
+                last_error = ?
+            WHERE application_id = ? AND status = 'running'
+            ''',
+            [(max_attempts, now, backoff_seconds, max_attempts, now, error[:500], i) for i in application_ids]
+        )
+        self._commit()
+
+    def get_scoring_status(self, application_id: int) -> Optional[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute(
+            '''
+            SELECT a.id AS application_id, a.candidate_id, a.suitability_score AS score,
+                   q.status, q.attempts, q.last_error, q.enqueued_at, q.finished_at
+            FROM applications a LEFT JOIN scoring_queue q ON q.application_id = a.id
+            WHERE a.id = ?
+            ''',
+            (application_id,)
+        )
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    def scoring_queue_metrics(self) -> Dict[str, Any]:
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.execute('SELECT status, COUNT(*) AS n FROM scoring_queue GROUP BY status')
+        counts = {r['status']: r['n'] for r in cur.fetchall()}
+        cur.execute("SELECT MIN(enqueued_at) AS oldest FROM scoring_queue WHERE status IN ('queued','running')")
+        oldest = cur.fetchone()['oldest']
+        cur.execute(
+            "SELECT AVG(finished_at - enqueued_at) AS avg_lag, MAX(finished_at - enqueued_at) AS max_lag, COUNT(*) AS n "
+            "FROM scoring_queue WHERE status = 'done' AND finished_at >= ?",
+            (now - 3600,)
+        )
+        recent = cur.fetchone()
+        return {
+            'queued': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'oldest_pending_seconds': round(now - oldest, 3) if oldest else 0.0,
+            'scored_last_hour': recent['n'],
+            'avg_lag_seconds_last_hour': round(recent['avg_lag'], 3) if recent['avg_lag'] is not None else None,
+            'max_lag_seconds_last_hour': round(recent['max_lag'], 3) if recent['max_lag'] is not None else None,
+        }
 
     def list_applicants_for_job(self, job_id: int) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
@@ -193,12 +1010,168 @@ class DBManager:
         rows = cur.fetchall()
         return [dict(r) for r in rows]
 
+    def list_applicants_page(self, job_id: int, limit: int = 20, cursor: Optional[str] = None,
+                             fields: str = 'summary') -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        cols = _projection(APPLICATION_FIELD_SETS, fields, 'a', ('id', 'created_at'))
+        where, params = '', []
+        if cursor:
+            where, params = 'AND (a.created_at, a.id) < (?, ?)', decode_cursor(cursor)
+        cur = self.conn.cursor()
+        cur.execute(
+            f'SELECT {cols} FROM applications a WHERE a.job_id = ? {where} ORDER BY a.created_at DESC, a.id DESC LIMIT ?',
+            (job_id, *params, limit + 1)
+        )
+        return _page(cur.fetchall(), limit, ('created_at', 'id'))
+
     def list_user_applications(self, candidate_id: int) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
         cur.execute('SELECT a.*, j.title FROM applications a JOIN jobs j ON j.id = a.job_id WHERE a.candidate_id = ? ORDER BY a.created_at DESC', (candidate_id,))
         rows = cur.fetchall()
         return [dict(r) for r in rows]
 
+    def latest_resume_path(self, candidate_id: int) -> Optional[str]:
+        cur = self.conn.cursor()
+        cur.execute(
+            'SELECT resume_path FROM applications WHERE candidate_id = ? AND resume_path IS NOT NULL ORDER BY created_at DESC, id DESC LIMIT 1',
+            (candidate_id,)
+        )
+        row = cur.fetchone()
+        return row['resume_path'] if row else None
+
+    def list_all_applications(self) -> List[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute('SELECT id, job_id, candidate_id, candidate_name, candidate_email, resume_path FROM applications ORDER BY created_at')
+        return [dict(r) for r in cur.fetchall()]
+
+    def list_resume_paths(self) -> List[str]:
+        cur = self.conn.cursor()
+        cur.execute('SELECT DISTINCT resume_path FROM applications WHERE resume_path IS NOT NULL')
+        return [r['resume_path'] for r in cur.fetchall()]
+
+    # Resume blobs
+    def register_blob(self, digest: str, path: str, size: int):
+        self.register_blobs([(digest, path, size)])
+
+    def register_blobs(self, blobs: List[Tuple[str, str, int]]):
+        """Record stored (digest, path, size) files. Storing an existing blob again refreshes
+        stored_at, so gc leaves it alone until the application that is about to reference
+        it has been inserted."""
+        now = time.time()
+        cur = self.conn.cursor()
+        cur.executemany(
+            'INSERT INTO blobs (digest, path, size, stored_at) VALUES (?,?,?,?) '
+            'ON CONFLICT(digest) DO UPDATE SET stored_at = excluded.stored_at',
+            [(digest, path, size, now) for digest, path, size in blobs]
+        )
+        self._commit()
+
+    def update_resume_path(self, application_id: int, resume_path: str):
+        cur = self.conn.cursor()
+        cur.execute('UPDATE applications SET resume_path = ? WHERE id = ?', (resume_path, application_id))
+        self._commit()
+
+    def referenced_resume_files(self) -> set:
+        """Resume file paths (without any '::' suffix) referenced by an application."""
+        return {p.split('::', 1)[0] for p in self.list_resume_paths()}
+
+    def recount_blob_refs(self):
+        """Recompute blobs.refcount from applications, in case the counters drifted."""
+        cur = self.conn.cursor()
+        cur.execute('SELECT resume_path FROM applications WHERE resume_path IS NOT NULL')
+        counts: Dict[str, int] = {}
+        for r in cur.fetchall():
+            path = r['resume_path'].split('::', 1)[0]
+            counts[path] = counts.get(path, 0) + 1
+        with self.transaction():
+            cur.execute('SELECT digest, path FROM blobs')
+            rows = cur.fetchall()
+            cur.executemany('UPDATE blobs SET refcount = ? WHERE digest = ?', [(counts.get(r['path'], 0), r['digest']) for r in rows])
+
+    def list_orphan_blobs(self, stored_before: float) -> List[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute('SELECT digest, path FROM blobs WHERE refcount <= 0 AND stored_at < ?', (stored_before,))
+        return [dict(r) for r in cur.fetchall()]
+
+    def delete_blobs(self, digests: List[str]):
+        cur = self.conn.cursor()
+        cur.executemany('DELETE FROM blobs WHERE digest = ? AND refcount <= 0', [(d,) for d in digests])
+        self._commit()
+
+    def blob_paths(self) -> set:
+        cur = self.conn.cursor()
+        cur.execute('SELECT path FROM blobs')
+        return {r['path'] for r in cur.fetchall()}
+
+    # Recruiter dashboard aggregates (one query each instead of a query per job)
+    def list_jobs_with_counts(self, recruiter_id: int) -> List[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute(
+            '''
+            SELECT j.*, COUNT(a.id) AS application_count
+            FROM jobs j LEFT JOIN applications a ON a.job_id = j.id
+            WHERE j.recruiter_id = ?
+            GROUP BY j.id
+            ORDER BY j.created_at DESC
+            ''',
+            (recruiter_id,)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def list_applications_for_recruiter(self, recruiter_id: int, job_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        cur = self.conn.cursor()
+        cur.execute(
+            f'''
+            SELECT a.*, j.title AS job_title
+            FROM applications a JOIN jobs j ON j.id = a.job_id
+            WHERE j.recruiter_id = ? {'AND a.job_id = ?' if job_id is not None else ''}
+            ORDER BY j.created_at DESC, a.created_at DESC
+            ''',
+            (recruiter_id,) if job_id is None else (recruiter_id, job_id)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+    def recruiter_stats(self, recruiter_id: int) -> Dict[str, Any]:
+        """Totals, status funnel and per-job score summaries for a recruiter's jobs."""
+        cur = self.conn.cursor()
+        cur.execute(
+            '''
+            SELECT j.id AS job_id, a.status AS status, COUNT(a.id) AS n,
+                   COUNT(a.suitability_score) AS scored, SUM(a.suitability_score) AS score_sum,
+                   MAX(a.suitability_score) AS best
+            FROM jobs j LEFT JOIN applications a ON a.job_id = j.id
+            WHERE j.recruiter_id = ?
+            GROUP BY j.id, a.status
+            ''',
+            (recruiter_id,)
+        )
+        jobs: Dict[int, Dict[str, Any]] = {}
+        funnel: Dict[str, int] = {}
+        total_sum = 0.0
+        for r in cur.fetchall():
+            job = jobs.setdefault(r['job_id'], {'applications': 0, 'scored': 0, 'score_sum': 0.0, 'best_score': None})
+            if not r['n']:
+                continue
+            status = r['status'] or 'pending'
+            funnel[status] = funnel.get(status, 0) + r['n']
+            job['applications'] += r['n']
+            job['scored'] += r['scored']
+            job['score_sum'] += r['score_sum'] or 0.0
+            total_sum += r['score_sum'] or 0.0
+            if r['best'] is not None and (job['best_score'] is None or r['best'] > job['best_score']):
+                job['best_score'] = r['best']
+        for job in jobs.values():
+            score_sum = job.pop('score_sum')
+            job['avg_score'] = round(score_sum / job['scored'], 2) if job['scored'] else None
+        scored = sum(j['scored'] for j in jobs.values())
+        return {
+            'jobs': len(jobs),
+            'applications': sum(funnel.values()),
+            'funnel': funnel,
+            'scored': scored,
+            'avg_score': round(total_sum / scored, 2) if scored else None,
+            'per_job': jobs,
+        }
+
     def list_ranked_candidates_for_recruiter(self, recruiter_id: int) -> List[Dict[str, Any]]:
         """Return applications for this recruiter's jobs, ordered by suitability_score desc."""
         cur = self.conn.cursor()
@@ -216,6 +1189,54 @@ class DBManager:
         rows = cur.fetchall()
         return [dict(r) for r in rows]
 
+    def list_ranked_candidates_page(self, recruiter_id: int, limit: int = 20, cursor: Optional[str] = None,
+                                    job_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Keyset-paged ranking on (score, id). With job_id a page is one index range scan;
+        without it the recruiter's per-job ranges past the cursor are merged with a top-N sort."""
+        where, params = '', [recruiter_id]
+        if job_id is not None:
+            where += ' AND a.job_id = ?'
+            params.append(job_id)
+        if cursor:
+            where += ' AND (a.suitability_score, a.id) < (?, ?)'
+            params += decode_cursor(cursor)
+        cur = self.conn.cursor()
+        cur.execute(
+            f'''
+            SELECT a.id as application_id, a.candidate_name as name, a.candidate_email as email,
+                   a.suitability_score as score, a.job_id, j.title as job_title
+            FROM applications a
+            JOIN jobs j ON j.id = a.job_id
+            WHERE j.recruiter_id = ? AND a.suitability_score IS NOT NULL{where}
+            ORDER BY a.suitability_score DESC, a.id DESC LIMIT ?
+            ''',
+            (*params, limit + 1)
+        )
+        return _page(cur.fetchall(), limit, ('score', 'application_id'))
+
+    def top_candidates_per_job(self, recruiter_id: int, k: int = 5) -> List[Dict[str, Any]]:
+        """The k best scored applications of each of the recruiter's jobs, with their rank."""
+        cur = self.conn.cursor()
+        # The correlated LIMIT reads at most k index entries per job, so the window
+        # function only ever ranks jobs * k rows however many applications there are
+        cur.execute(
+            '''
+            SELECT a.id as application_id, a.candidate_name as name, a.candidate_email as email,
+                   a.suitability_score as score, a.job_id, j.title as job_title,
+                   ROW_NUMBER() OVER (PARTITION BY a.job_id ORDER BY a.suitability_score DESC, a.id DESC) AS rank
+            FROM jobs j
+            JOIN applications a ON a.id IN (
+                SELECT b.id FROM applications b
+                WHERE b.job_id = j.id AND b.suitability_score IS NOT NULL
+                ORDER BY b.suitability_score DESC, b.id DESC LIMIT ?
+            )
+            WHERE j.recruiter_id = ?
+            ORDER BY j.created_at DESC, a.job_id, rank
+            ''',
+            (k, recruiter_id)
+        )
+        return [dict(r) for r in cur.fetchall()]
+
     def get_application_by_id(self, application_id: int) -> Optional[Dict[str, Any]]:
         cur = self.conn.cursor()
         cur.execute(
@@ -231,7 +1252,28 @@ class DBManager:
         return dict(row) if row else None
 
     def update_application_status(self, application_id: int, status: str) -> bool:
-        cur = self.conn.cursor()
-        cur.execute('UPDATE applications SET status = ? WHERE id = ?', (status, application_id))
-        self.conn.commit()
-        return cur.rowcount > 0
+        return self.update_application_statuses([(application_id, status)]) > 0
+
+
+_shared: Optional[DBManager] = None
+_shared_lock = threading.Lock()
+
+
+def get_db() -> DBManager:
+    """The process-wide DBManager; long-lived modules share it instead of opening their own."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DBManager()
+    return _shared
+
+
+if __name__ == '__main__':
+    # python -m database.db_manager  -> apply pending migrations and check hot query plans
+    import sys
+    manager = DBManager()
+    print(f"schema version {manager.conn.execute('PRAGMA user_version').fetchone()[0]}")
+    problems = manager.check_query_plans()
+    for problem in problems:
+        print(problem)
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from database.db_manager import DBManager, add_job_listener, get_db
+
+# Read-through, in-process cache of the jobs table (rows as list_jobs() returns
+# them, with recruiter_name). Entries are valid while two counters are unchanged:
+#   - a local version, bumped by create_job/update_job/delete_job in this process
+#     (job listener, after commit)
+#   - catalog_versions.jobs in the database, bumped by triggers on every jobs write,
+#     so edits made by another worker process are noticed too
+# The database counter is only read when PRAGMA data_version reports that another
+# connection committed something since the last check; otherwise a lookup costs
+# no query at all beyond that pragma, which never touches the file.
+
+JOB_CACHE_SIZE = int(os.getenv('JOB_CACHE_SIZE', '10000'))  # jobs kept for get(); 0 disables
+
+
+class JobCatalog:
+    def __init__(self, db: DBManager, max_jobs: int = JOB_CACHE_SIZE):
+        self.db = db
+        self.max_jobs = max_jobs
+        self._by_id: 'OrderedDict[int, Dict[str, Any]]' = OrderedDict()
+        self._all: Optional[List[Dict[str, Any]]] = None
+        self._local_version = 0
+        self._db_version: Optional[int] = None
+        self._seen = threading.local()  # data_version last seen on this thread's connection
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def invalidate(self, *args):
+        with self._lock:
+            self._local_version += 1
+            self._by_id.clear()
+            self._all = None
+
+    @property
+    def version(self) -> Tuple[int, Optional[int]]:
+        return self._local_version, self._db_version
+
+    def current_version(self) -> Tuple[int, Optional[int]]:
+        """Changes whenever the jobs may have changed (for caches derived from all())."""
+        self._check()
+        return self.version
+
+    def _check(self):
+        conn = self.db.conn
+        data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if getattr(self._seen, 'conn', None) is conn and self._seen.data_version == data_version:
+            return
+        self._seen.conn, self._seen.data_version = conn, data_version
+        db_version = self.db.catalog_version('jobs')
+        with self._lock:
+            if db_version != self._db_version:
+                self._db_version = db_version
+                self._by_id.clear()
+                self._all = None
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """One job by id (a copy), or None if there is no such job."""
+        self._check()
+        with self._lock:
+            job = self._by_id.get(job_id)
+            if job is not None:
+                self._by_id.move_to_end(job_id)
+                self.hits += 1
+                return dict(job)
+            version = self.version
+        self.misses += 1
+        job = self.db.get_job_by_id(job_id)
+        if job is not None:
+            self._store(version, [job])
+        return dict(job) if job else None
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Every job, newest first (copies)."""
+        self._check()
+        with self._lock:
+            jobs = self._all
+            version = self.version
+        if jobs is None:
+            self.misses += 1
+            jobs = self.db.list_jobs()
+            self._store(version, jobs, complete=True)
+        else:
+            self.hits += 1
+        return [dict(j) for j in jobs]
+
+    def _store(self, version: Tuple[int, Optional[int]], jobs: List[Dict[str, Any]], complete: bool = False):
+        with self._lock:
+            # Drop what was read while a write invalidated the cache
+            if version != self.version:
+                return
+            if complete:
+                self._all = jobs
+            for job in jobs[:self.max_jobs]:
+                self._by_id[job['id']] = job
+            while len(self._by_id) > self.max_jobs:
+                self._by_id.popitem(last=False)
+
+
+job_catalog = JobCatalog(get_db())
+add_job_listener(job_catalog.invalidate)
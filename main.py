@@ -3,7 +3,7 @@ import gradio as gr
 from dotenv import load_dotenv
 
 # Local imports
-from database.db_manager import DBManager
+from database.db_manager import get_db
 from auth.login_manager import signup_start, signup_verify, login_start, login_verify, AuthError
 from ui.recruiter_ui import recruiter_panel
 from ui.candidate_ui import candidate_panel
@@ -12,7 +12,7 @@ from ui.candidate_ui import candidate_panel
 load_dotenv()
 
 # Initialize DB connection
-db = DBManager()
+db = get_db()
 
 # Path to CSS file
 STATIC_CSS = os.path.join(os.path.dirname(__file__), "static", "styles.css")
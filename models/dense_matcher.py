@@ -0,0 +1,267 @@
+import os
+import sys
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+
+from models.resume_matcher import ResumeMatcher, matcher, corpus_from_db
+
+# Dense matcher: LSA (TruncatedSVD) projection of the fitted TF-IDF space, so
+# resumes that use synonyms of the job's wording still land close to it.
+# MATCHER_MODE=dense switches scoring to it once a model matching the current
+# TF-IDF vocabulary exists; the exact sparse matcher stays the default.
+
+MATCHER_MODE = os.getenv('MATCHER_MODE', 'exact')
+DENSE_MODEL_PATH = os.getenv('DENSE_MODEL_PATH', os.path.join(os.path.dirname(__file__), 'lsa_model.npz'))
+ANN_INDEX_PATH = os.getenv('ANN_INDEX_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'vectors', 'ivf.npz'))
+N_COMPONENTS = int(os.getenv('DENSE_COMPONENTS', '256'))
+ANN_NPROBE = int(os.getenv('ANN_NPROBE', '8'))
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return x / norms
+
+
+class DenseMatcher:
+    def __init__(self, base: ResumeMatcher = matcher, path: str = DENSE_MODEL_PATH):
+        self.base = base
+        self.path = path
+        self.components: Optional[np.ndarray] = None
+        self.model_id: Optional[str] = None
+
+    @property
+    def fitted(self) -> bool:
+        # The projection is only valid for the vocabulary it was fit on
+        return self.components is not None and self.model_id == self.base.model_id
+
+    @property
+    def version(self) -> Optional[str]:
+        return f"lsa{self.components.shape[0]}.{self.base.version}" if self.fitted else None
+
+    def fit(self, documents: List[str], n_components: int = N_COMPONENTS) -> 'DenseMatcher':
+        X = self.base.transform(documents)
+        k = max(1, min(n_components, X.shape[0] - 1, X.shape[1] - 1))
+        svd = TruncatedSVD(n_components=k, random_state=0).fit(X)
+        self.components = svd.components_.astype(np.float32)
+        self.model_id = self.base.model_id
+        return self
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, components=self.components, model_id=np.array(self.model_id))
+        os.replace(tmp, path)
+
+    def load(self, path: Optional[str] = None) -> bool:
+        path = path or self.path
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as state:
+            self.components = state['components']
+            self.model_id = str(state['model_id'])
+        return True
+
+    # Embeddings are unit-length float32 rows, so dot products are cosines
+    def embed_weighted(self, X) -> np.ndarray:
+        return _unit(X @ self.components.T)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.embed_weighted(self.base.transform(texts))
+
+    def embed_counts(self, counts) -> np.ndarray:
+        return self.embed_weighted(self.base.weigh(counts))
+
+    @staticmethod
+    def similarity(job_emb: np.ndarray, resume_emb: np.ndarray) -> np.ndarray:
+        return np.clip(job_emb @ resume_emb.T, 0.0, None).astype(np.float64) * 100
+
+    def score_batch(self, job_description: str, resumes: List[str]) -> np.ndarray:
+        if not resumes:
+            return np.zeros(0)
+        return self.similarity(self.embed([job_description]), self.embed(resumes))[0]
+
+    def score_matrix(self, job_descriptions: List[str], resumes: List[str]) -> np.ndarray:
+        if not job_descriptions or not resumes:
+            return np.zeros((len(job_descriptions), len(resumes)))
+        return self.similarity(self.embed(job_descriptions), self.embed(resumes))
+
+    def score(self, job_description: str, resumes: List[str]) -> List[float]:
+        return [round(float(v), 2) for v in self.score_batch(job_description, resumes)]
+
+
+def _kmeans(vectors: np.ndarray, k: int, iterations: int = 12, sample: int = 20000, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of unit vectors; returns unit centroids."""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample:
+        vectors = vectors[rng.choice(len(vectors), sample, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        empty = ~sums.any(axis=1)
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _unit(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file ANN index over unit vectors (inner product).
+
+    Vectors are bucketed by their nearest k-means centroid and stored contiguously
+    per bucket; a query scans only the nprobe closest buckets. Vectors added after
+    the build go to a small flat buffer until the next rebuild; sync() fills it
+    from the resume vector store, so resumes stored after the build (by any
+    process, before or after a restart) are searchable without saving the index.
+    """
+
+    def __init__(self, nprobe: int = ANN_NPROBE):
+        self.nprobe = nprobe
+        self.model_version: Optional[str] = None
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=object)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.pending_ids: List[str] = []
+        self.pending: List[np.ndarray] = []
+        self._known = set()  # ids and pending_ids
+        self._synced = -1    # store size at the last sync()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids) + len(self.pending_ids)
+
+    def build(self, ids: List[str], vectors: np.ndarray, model_version: Optional[str] = None, nlist: Optional[int] = None) -> 'IVFIndex':
+        vectors = _unit(vectors)
+        self.model_version = model_version
+        self.pending_ids, self.pending = [], []
+        if not len(ids):
+            self.__init__(self.nprobe)
+            self.model_version = model_version
+            return self
+        nlist = max(1, min(nlist or int(np.sqrt(len(ids))), len(ids)))
+        self.centroids = _kmeans(vectors, nlist)
+        assign = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assign, kind='stable')
+        self.vectors = vectors[order]
+        self.ids = np.asarray(ids, dtype=object)[order]
+        self.offsets = np.searchsorted(assign[order], np.arange(nlist + 1)).astype(np.int64)
+        self._known, self._synced = set(ids), -1
+        return self
+
+    def add(self, id_: str, vector: np.ndarray):
+        with self._lock:
+            if id_ in self._known:
+                return
+            self._known.add(id_)
+            self.pending_ids.append(id_)
+            self.pending.append(_unit(np.atleast_2d(vector))[0])
+
+    def sync(self, store, dense: 'DenseMatcher', batch: int = 4096) -> int:
+        """Add vectors in store that the index doesn't hold yet to the flat buffer; returns how many."""
+        store.refresh()
+        if len(store) == self._synced:
+            return 0
+        with self._lock:
+            size = len(store)
+            missing = [d for d in list(store.rows) if d not in self._known]
+        for i in range(0, len(missing), batch):
+            chunk = missing[i:i + batch]
+            for digest, vector in zip(chunk, dense.embed_counts(store.get_rows(chunk))):
+                self.add(digest, vector)
+        self._synced = size
+        return len(missing)
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        query = _unit(np.atleast_2d(query))[0]
+        ids, scores = [], []
+        if len(self.centroids):
+            nprobe = min(nprobe or self.nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe])
+            ids.append(self.ids[rows])
+            scores.append(self.vectors[rows] @ query)
+        with self._lock:
+            pending_ids, pending = list(self.pending_ids), list(self.pending)
+        if pending:
+            ids.append(np.asarray(pending_ids, dtype=object))
+            scores.append(np.vstack(pending) @ query)
+        if not ids:
+            return []
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(str(ids[i]), float(scores[i])) for i in top]
+
+    def save(self, path: str = ANN_INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pending = np.vstack(self.pending) if self.pending else np.zeros((0, self.vectors.shape[1]), dtype=np.float32)
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, centroids=self.centroids, vectors=self.vectors, ids=np.asarray(self.ids, dtype=str),
+                 offsets=self.offsets, pending_ids=np.asarray(self.pending_ids, dtype=str),
+                 pending=pending, model_version=np.array(self.model_version or ''))
+        os.replace(tmp, path)
+
+    def load(self, path: str = ANN_INDEX_PATH) -> bool:
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as state:
+            self.centroids = state['centroids']
+            self.vectors = state['vectors']
+            self.ids = state['ids'].astype(object)
+            self.offsets = state['offsets']
+            self.pending_ids = [str(i) for i in state['pending_ids']]
+            self.pending = list(state['pending'])
+            self.model_version = str(state['model_version']) or None
+        self._known, self._synced = set(self.ids) | set(self.pending_ids), -1
+        return True
+
+
+def build_resume_index(store, dense: Optional[DenseMatcher] = None, batch: int = 4096) -> IVFIndex:
+    """(Re)build the resume ANN index from every vector in the resume vector store."""
+    dense = dense or dense_matcher
+    digests = list(store.rows)
+    chunks = [dense.embed_counts(store.get_rows(digests[i:i + batch])) for i in range(0, len(digests), batch)]
+    vectors = np.vstack(chunks) if chunks else np.zeros((0, dense.components.shape[0]), dtype=np.float32)
+    return resume_ann.build(digests, vectors, model_version=dense.version)
+
+
+def use_dense() -> bool:
+    return MATCHER_MODE == 'dense' and dense_matcher.fitted
+
+
+dense_matcher = DenseMatcher()
+dense_matcher.load()
+resume_ann = IVFIndex()
+resume_ann.load()
+
+
+if __name__ == '__main__':
+    # python -m models.dense_matcher  -> fit LSA on the DB corpus and rebuild the resume ANN index
+    from database.db_manager import DBManager
+    from models.vector_store import vector_store
+    if not matcher.fitted:
+        print("Fit the TF-IDF model first: python -m models.resume_matcher", file=sys.stderr)
+        sys.exit(1)
+    docs = corpus_from_db(DBManager())
+    if len(docs) < 2:
+        print("Need at least two documents to fit LSA.", file=sys.stderr)
+        sys.exit(1)
+    dense_matcher.fit(docs)
+    dense_matcher.save()
+    # Resumes whose vectors were dropped by a refit would be missing from the index
+    from models.scoring import backfill_vectors
+    added = backfill_vectors(DBManager())
+    store = vector_store.open(matcher.model_id, len(matcher.df))
+    build_resume_index(store).save()
+    print(f"LSA with {dense_matcher.components.shape[0]} components; ANN index over {len(resume_ann)} resumes"
+          f" ({added} vectors backfilled)")
@@ -0,0 +1,85 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from database.db_manager import add_job_listener
+from database.job_catalog import job_catalog
+from models.dense_matcher import dense_matcher, use_dense
+from models.resume_matcher import matcher, resume_file_path
+from models.scoring import index_resume, job_text, job_vectors, resume_vectors
+from utils.resume_parser import parse_resume
+
+# "Recommended jobs" feed. All jobs are vectorized once into a row-normalized
+# matrix; a candidate's feed is one matrix-vector product against their latest
+# resume, cached per (candidate, resume) until a job is created, updated or deleted
+# (here, or by another worker: the job catalog version changes).
+
+MAX_RECOMMENDATIONS = int(os.getenv('MAX_RECOMMENDATIONS', '50'))
+FEED_CACHE_SIZE = int(os.getenv('FEED_CACHE_SIZE', '10000'))
+
+
+class JobRecommender:
+    def __init__(self):
+        self._jobs: Optional[List[Dict[str, Any]]] = None
+        self._matrix = None
+        self._model = None
+        self._catalog = None
+        self._feeds: 'OrderedDict[tuple, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self, *args):
+        with self._lock:
+            self._jobs = None
+            self._matrix = None
+            self._feeds.clear()
+
+    def _model_version(self) -> Optional[str]:
+        return dense_matcher.version if use_dense() else matcher.version
+
+    def _job_matrix(self, db):
+        # Rebuild when jobs changed or the matcher was refit under us
+        version = job_catalog.current_version()
+        if self._jobs is None or self._catalog != version or self._model != self._model_version():
+            jobs = job_catalog.all()
+            texts = [job_text(j) for j in jobs]
+            matrix = job_vectors(texts) if jobs and matcher.fitted else None
+            self._jobs, self._matrix, self._model = jobs, matrix, self._model_version()
+            self._catalog = version
+            self._feeds.clear()
+        return self._jobs, self._matrix
+
+    def recommend(self, db, candidate_id: int, k: int = 10) -> List[Dict[str, Any]]:
+        resume_path = db.latest_resume_path(candidate_id)
+        path = resume_file_path(resume_path) if resume_path else ''
+        if not path or not os.path.exists(path):
+            return []
+        with self._lock:
+            jobs, matrix = self._job_matrix(db)
+            if not jobs:
+                return []
+            # mtime catches a re-apply that overwrote the same upload path
+            key = (candidate_id, path, os.path.getmtime(path))
+            feed = self._feeds.get(key)
+            if feed is None:
+                if matcher.fitted:
+                    sims = matrix @ resume_vectors([index_resume(path)]).T
+                    scores = np.asarray(sims.toarray() if hasattr(sims, 'toarray') else sims).ravel() * 100
+                else:
+                    scores = matcher.score_matrix([parse_resume(path)], [job_text(j) for j in jobs])[0]
+                n = min(MAX_RECOMMENDATIONS, len(jobs))
+                top = np.argpartition(-scores, n - 1)[:n]
+                top = top[np.argsort(-scores[top], kind='stable')]
+                feed = [dict(jobs[i], match_score=round(float(max(scores[i], 0.0)), 2)) for i in top]
+                self._feeds[key] = feed
+                if len(self._feeds) > FEED_CACHE_SIZE:
+                    self._feeds.popitem(last=False)
+            else:
+                self._feeds.move_to_end(key)
+            return feed[:k]
+
+
+recommender = JobRecommender()
+add_job_listener(recommender.invalidate)
@@ -1,25 +1,194 @@
-from typing import List
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import sys
+import uuid
+from typing import List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
 
 # Simple TF-IDF based matcher. For production, replace / augment with embeddings.
+#
+# Two modes:
+#  - fitted: vocabulary and document frequencies come from the whole job + resume
+#    corpus (see fit_from_db) and are saved to MODEL_PATH; requests only transform.
+#  - legacy: no saved model, so the vectorizer is fit on [job] + resumes per call.
+
+MODEL_PATH = os.getenv('MATCHER_MODEL_PATH', os.path.join(os.path.dirname(__file__), 'tfidf_model.joblib'))
+MAX_FEATURES = int(os.getenv('MATCHER_MAX_FEATURES', '5000'))
+
 
 class ResumeMatcher:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
+    def __init__(self, model_path: str = MODEL_PATH):
+        self.model_path = model_path
+        self.counter: Optional[CountVectorizer] = None
+        self.df: Optional[np.ndarray] = None
+        self.idf: Optional[np.ndarray] = None
+        self.n_docs = 0
+        self.model_id: Optional[str] = None
+        self._feature_names: Optional[np.ndarray] = None
 
-    def score(self, job_description: str, resumes: List[str]) -> List[float]:
+    @property
+    def fitted(self) -> bool:
+        return self.counter is not None
+
+    @property
+    def version(self) -> Optional[str]:
+        # Changes whenever the idf weights change, so cached scores can key on it.
+        return f"{self.model_id}.{self.n_docs}" if self.fitted else None
+
+    @property
+    def feature_names(self) -> np.ndarray:
+        if self._feature_names is None:
+            self._feature_names = self.counter.get_feature_names_out()
+        return self._feature_names
+
+    # Fitting
+    def fit(self, documents: List[str]) -> 'ResumeMatcher':
+        counter = CountVectorizer(stop_words='english', max_features=MAX_FEATURES)
+        counts = counter.fit_transform(documents)
+        self.counter = counter
+        self._feature_names = None
+        self.df = np.bincount(counts.indices, minlength=counts.shape[1]).astype(np.int64)
+        self.n_docs = counts.shape[0]
+        self.model_id = uuid.uuid4().hex[:12]
+        self._update_idf()
+        return self
+
+    def _update_idf(self):
+        # Same smoothed idf as TfidfVectorizer's defaults.
+        self.idf = np.log((1.0 + self.n_docs) / (1.0 + self.df)) + 1.0
+
+    # Persistence
+    def save(self, path: Optional[str] = None):
+        path = path or self.model_path
+        tmp = path + '.tmp'
+        joblib.dump({
+            'counter': self.counter,
+            'df': self.df,
+            'n_docs': self.n_docs,
+            'model_id': self.model_id,
+        }, tmp)
+        os.replace(tmp, path)
+
+    def load(self, path: Optional[str] = None) -> bool:
+        path = path or self.model_path
+        if not os.path.exists(path):
+            return False
+        state = joblib.load(path)
+        self.counter = state['counter']
+        self._feature_names = None
+        self.df = state['df']
+        self.n_docs = state['n_docs']
+        self.model_id = state['model_id']
+        self._update_idf()
+        return True
+
+    # Vectors
+    def term_counts(self, texts: List[str]):
+        """Raw term counts in the fitted vocabulary (independent of idf)."""
+        return self.counter.transform(texts)
+
+    def weigh(self, counts):
+        """Apply the current idf weights and L2-normalize the rows."""
+        return normalize(counts.multiply(self.idf).tocsr())
+
+    def transform(self, texts: List[str]):
+        return self.weigh(self.term_counts(texts))
+
+    def _vectorize(self, jobs: List[str], resumes: List[str]):
+        if self.fitted:
+            return self.transform(jobs), self.transform(resumes)
+        # Legacy mode: one fit over jobs + resumes, shared by every pair. A fresh
+        # vectorizer per call: callers run on several threads at once. Its rows
+        # are L2-normalized already (norm='l2'), like weigh()'s.
+        tfidf = TfidfVectorizer(stop_words='english', max_features=MAX_FEATURES).fit_transform(jobs + resumes)
+        return tfidf[:len(jobs)], tfidf[len(jobs):]
+
+    @staticmethod
+    def similarity(job_vecs, resume_vecs) -> np.ndarray:
+        """Cosine similarities (0-100) of every job row against every resume row,
+        as one sparse product. Rows must already be L2-normalized (weigh() and
+        transform() return them that way)."""
+        sims = job_vecs @ resume_vecs.T
+        return np.asarray(sims.toarray() if hasattr(sims, 'toarray') else sims, dtype=np.float64) * 100
+
+    def score_batch(self, job_description: str, resumes: List[str]) -> np.ndarray:
         if not resumes:
-            return []
-        corpus = [job_description] + resumes
-        tfidf = self.vectorizer.fit_transform(corpus)
-        job_vec = tfidf[0]
-        scores = []
-        for i in range(1, len(corpus)):
-            sim = cosine_similarity(job_vec, tfidf[i])
-            # similarity returns array [[value]]
-            value = float(sim[0][0])
-            scores.append(round(value * 100, 2))
-        return scores
+            return np.zeros(0)
+        job_vec, resume_vecs = self._vectorize([job_description], resumes)
+        return self.similarity(job_vec, resume_vecs)[0]
+
+    def score_matrix(self, job_descriptions: List[str], resumes: List[str]) -> np.ndarray:
+        """Scores with shape (len(job_descriptions), len(resumes))."""
+        if not job_descriptions or not resumes:
+            return np.zeros((len(job_descriptions), len(resumes)))
+        job_vecs, resume_vecs = self._vectorize(job_descriptions, resumes)
+        return self.similarity(job_vecs, resume_vecs)
+
+    def rank(self, job_description: str, resumes: List[str], top_k: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(resume index, score) pairs, best first."""
+        scores = self.score_batch(job_description, resumes)
+        order = np.argsort(-scores, kind='stable')
+        if top_k is not None:
+            order = order[:top_k]
+        return [(int(i), round(float(scores[i]), 2)) for i in order]
+
+    def score(self, job_description: str, resumes: List[str]) -> List[float]:
+        return [round(float(v), 2) for v in self.score_batch(job_description, resumes)]
+
+
+def resume_file_path(resume_path: str) -> str:
+    # Rows written before schema migration 2 carried "::phone:..|skills:.." after the path
+    return (resume_path or '').split('::', 1)[0]
+
+
+def job_corpus_from_db(db) -> List[str]:
+    return [j['description'] for j in db.list_jobs() if j.get('description')]
+
+
+def resume_corpus_from_db(db) -> List[str]:
+    from utils.resume_parser import parse_resume
+    docs = []
+    for path in db.list_resume_paths():
+        path = resume_file_path(path)
+        if os.path.exists(path):
+            text = parse_resume(path)
+            if text:
+                docs.append(text)
+    return docs
+
+
+def corpus_from_db(db) -> List[str]:
+    return job_corpus_from_db(db) + resume_corpus_from_db(db)
+
+
+def fit_from_db(db, target: Optional[ResumeMatcher] = None) -> ResumeMatcher:
+    target = target or matcher
+    docs = corpus_from_db(db)
+    if not docs:
+        return target
+    target.fit(docs)
+    target.save()
+    return target
+
 
 matcher = ResumeMatcher()
+matcher.load()
+
+
+if __name__ == '__main__':
+    # python -m models.resume_matcher  -> (re)fit on the DB corpus and save the model.
+    # The new vocabulary resets the resume vector store, which is refilled here;
+    # running servers must be restarted to load the new model.
+    from database.db_manager import DBManager
+    db = DBManager()
+    fitted = fit_from_db(db)
+    if fitted.fitted:
+        from models.scoring import backfill_vectors  # imported after saving, so it loads the new model
+        added = backfill_vectors(db)
+        print(f"Fitted {len(fitted.df)} terms on {fitted.n_docs} documents -> {fitted.model_path}; "
+              f"stored {added} resume vectors. Restart the server to use the new model.")
+    else:
+        print("No jobs or resumes in the database; nothing to fit.", file=sys.stderr)
@@ -0,0 +1,243 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from database.db_manager import split_skill_list
+from models.dense_matcher import dense_matcher, resume_ann, use_dense
+from models.resume_matcher import matcher, resume_file_path
+from models.skill_matcher import blend, coverage, skill_automaton
+from models.vector_store import vector_store
+from utils.hashing import file_sha256
+from utils.resume_parser import parse_resume
+
+# Glue between the matcher, the resume vector store and the score cache.
+# With a fitted matcher, resumes are parsed once (on apply) and every later
+# rescoring is a batched product over stored vectors. The final suitability
+# score blends that similarity with the share of the job's skills found.
+
+
+def job_text(job: Dict[str, Any]) -> str:
+    return job.get('description') or ''
+
+
+def job_version(job: Dict[str, Any]) -> str:
+    """Content hash of what a job is scored on, under the current model."""
+    model = dense_matcher.version if use_dense() else matcher.version
+    key = f"{model}\0{job_text(job)}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+
+def _store():
+    return vector_store.open(matcher.model_id, len(matcher.df))
+
+
+def index_resume(path: str, text: Optional[str] = None, counts=None) -> Optional[str]:
+    """Make sure the resume file has a stored vector and return its hash.
+    Only parses the file when its content has not been seen before; counts
+    (already computed, e.g. in a worker process) skip the transform as well."""
+    if not matcher.fitted or not os.path.exists(path):
+        return None
+    store = _store()
+    digest = file_sha256(path)
+    store.link_path(path, digest)
+    if digest not in store:
+        if counts is None:
+            if text is None:
+                text = parse_resume(path, digest)
+            counts = matcher.term_counts([text or ''])
+        store.add(digest, counts)
+        if use_dense() and resume_ann.model_version == dense_matcher.version:
+            resume_ann.add(digest, dense_matcher.embed_counts(counts)[0])
+    return digest
+
+
+def backfill_vectors(db) -> int:
+    """Store a vector for every application's resume file that lacks one (after a
+    refit reset the store). Returns how many were added."""
+    if not matcher.fitted:
+        return 0
+    before = len(_store())
+    for path in db.list_resume_paths():
+        index_resume(resume_file_path(path))
+    return len(_store()) - before
+
+
+def resume_hash_known(path: str) -> bool:
+    """True when the file at path already has a stored vector (no parsing needed)."""
+    return matcher.fitted and _store().hash_for_path(path) is not None
+
+
+def resume_hash_for(path: str) -> Optional[str]:
+    if not matcher.fitted:
+        return None
+    return _store().hash_for_path(path) or index_resume(path)
+
+
+def job_vectors(texts: List[str]):
+    """Job vectors in the active (sparse TF-IDF or dense LSA) space."""
+    return dense_matcher.embed(texts) if use_dense() else matcher.transform(texts)
+
+
+def resume_vectors(digests: List[str]):
+    """Stored resume vectors in the active space, rows L2-normalized."""
+    counts = _store().get_rows(digests)
+    return dense_matcher.embed_counts(counts) if use_dense() else matcher.weigh(counts)
+
+
+def score_hashes(db, job: Dict[str, Any], digests: List[str]) -> Dict[str, float]:
+    """Scores for stored resume vectors, served from the memo where possible."""
+    version = job_version(job)
+    unique = list(dict.fromkeys(digests))
+    scores = db.get_cached_scores(version, unique)
+    missing = [d for d in unique if d not in scores]
+    if missing:
+        similarity = dense_matcher.similarity if use_dense() else matcher.similarity
+        fresh = similarity(job_vectors([job_text(job)]), resume_vectors(missing))[0]
+        computed = {d: round(float(v), 2) for d, v in zip(missing, fresh)}
+        db.cache_scores(version, computed)
+        scores.update(computed)
+    return scores
+
+
+def nearest_resumes(query: str, k: int = 50) -> List:
+    """ANN lookup of (resume hash, cosine) pairs; empty unless the dense index is current."""
+    if not use_dense() or resume_ann.model_version != dense_matcher.version:
+        return []
+    resume_ann.sync(_store(), dense_matcher)
+    return resume_ann.search(dense_matcher.embed([query])[0], k)
+
+
+def found_skills(db, job: Dict[str, Any], resumes: Dict[str, str], texts: Optional[Dict[str, str]] = None):
+    """(job's canonical skills, {hash: skills found in that resume}) for resumes
+    given as hash -> path. Skills found in a resume are stored per hash; a resume is
+    only re-scanned if the job names a skill registered after that scan."""
+    wanted = skill_automaton.canonical_set(job.get('skills') or '')
+    if not wanted:
+        return wanted, {}
+    skill_automaton.refresh(db)
+    newest = max(db.get_skill_ids(split_skill_list(job.get('skills'))).values(), default=0)
+    known = db.get_resume_skills(list(resumes))
+    out = {}
+    for digest, path in resumes.items():
+        rec = known.get(digest)
+        if rec and rec[1] >= newest:
+            out[digest] = rec[0]
+            continue
+        text = (texts or {}).get(digest)
+        if text is None:
+            text = parse_resume(path, digest) if os.path.exists(path) else ''
+        out[digest] = skill_automaton.scan(text)
+        db.save_resume_skills(digest, out[digest], skill_automaton.max_id)
+    return wanted, out
+
+
+def skill_coverages(db, job: Dict[str, Any], resumes: Dict[str, str], texts: Optional[Dict[str, str]] = None) -> Dict[str, Optional[float]]:
+    """Share of the job's skills found in each resume, None if the job lists none."""
+    wanted, found = found_skills(db, job, resumes, texts)
+    return {d: coverage(wanted, found[d]) if wanted else None for d in resumes}
+
+
+def score_resume(db, job: Dict[str, Any], path: str, text: Optional[str] = None, counts=None) -> float:
+    digest = index_resume(path, text, counts)
+    if digest:
+        text_score = score_hashes(db, job, [digest])[digest]
+    else:
+        if text is None:
+            text = parse_resume(path)
+        text_score = matcher.score(job_text(job), [text])[0] if text else 0.0
+        if not os.path.exists(path):
+            return text_score
+        digest = file_sha256(path)
+    return blend(text_score, skill_coverages(db, job, {digest: path}, {digest: text} if text is not None else None)[digest])
+
+
+def score_paths(db, job: Dict[str, Any], paths: List[str], features: Optional[Dict[str, tuple]] = None) -> List[float]:
+    """Suitability of each resume file against one job, computed in a single batch.
+    features maps a resume path to the (text, counts) already extracted for it,
+    e.g. by a worker process."""
+    if not paths:
+        return []
+    features = features or {}
+    texts = None
+    if matcher.fitted:
+        digests = []
+        for p in paths:
+            text, counts = features.get(p, (None, None))
+            digests.append(index_resume(p, text, counts) if p in features else resume_hash_for(p))
+        scores = score_hashes(db, job, [d for d in digests if d])
+        text_scores = [scores[d] if d else 0.0 for d in digests]
+    else:
+        texts = [features[p][0] if p in features else (parse_resume(p) if os.path.exists(p) else '') for p in paths]
+        batch = matcher.score_batch(job_text(job), texts) if any(texts) else [0.0] * len(texts)
+        text_scores = [round(float(v), 2) if t else 0.0 for v, t in zip(batch, texts)]
+        digests = [file_sha256(p) if os.path.exists(p) else None for p in paths]
+    resumes = {d: p for d, p in zip(digests, paths) if d}
+    known_texts = {d: t for d, t in zip(digests, texts) if d} if texts else {
+        d: features[p][0] for d, p in zip(digests, paths) if d and p in features}
+    coverages = skill_coverages(db, job, resumes, known_texts)
+    return [blend(text_score, coverages.get(digest)) if digest else 0.0
+            for digest, text_score in zip(digests, text_scores)]
+
+
+def score_applications(db, job: Dict[str, Any], applications: List[Dict[str, Any]],
+                       features: Optional[Dict[str, tuple]] = None) -> Dict[int, float]:
+    """Score applications (rows with id/application_id and resume_path) against one job
+    in a single batch and store the scores."""
+    paths = [resume_file_path(a['resume_path']) for a in applications]
+    ids = [a.get('application_id', a.get('id')) for a in applications]
+    results = dict(zip(ids, score_paths(db, job, paths, features)))
+    db.set_application_scores(list(results.items()))
+    return results
+
+
+def rescore_job(db, job: Dict[str, Any]) -> int:
+    """Recompute suitability_score for every applicant of job. Returns the count."""
+    return len(score_applications(db, job, db.list_applicants_for_job(job['id'])))
+
+
+_explanations: 'OrderedDict[tuple, Dict[str, Any]]' = OrderedDict()
+_explanations_lock = threading.Lock()  # explain() runs on several DB threads
+EXPLANATION_CACHE_SIZE = int(os.getenv('EXPLANATION_CACHE_SIZE', '5000'))
+
+
+def explain(db, job: Dict[str, Any], path: str, top_n: int = 10) -> Optional[Dict[str, Any]]:
+    """Top contributing terms and matched/missing skills behind a score.
+
+    Term contributions are the element-wise product of the stored job and resume
+    TF-IDF vectors (in exact mode they sum to the text score), so nothing is refit or
+    re-parsed.
+    Memoized per (job version, job skills, resume hash)."""
+    digest = resume_hash_for(path)
+    if not digest:
+        return None
+    key = (job_version(job), job.get('skills') or '', digest, top_n)
+    with _explanations_lock:
+        cached = _explanations.get(key)
+        if cached is not None:
+            _explanations.move_to_end(key)
+            return cached
+    contrib = matcher.transform([job_text(job)]).multiply(matcher.weigh(_store().get_rows([digest]))).tocsr()
+    order = np.argsort(-contrib.data)[:top_n]
+    names = matcher.feature_names
+    terms = [{'term': str(names[contrib.indices[i]]), 'contribution': round(float(contrib.data[i]) * 100, 2)} for i in order]
+    wanted, found = found_skills(db, job, {digest: path})
+    matched = sorted(wanted & found.get(digest, set()))
+    text_score = score_hashes(db, job, [digest])[digest]
+    skill_coverage = coverage(wanted, found.get(digest, set())) if wanted else None
+    result = {
+        'score': blend(text_score, skill_coverage),
+        'text_score': text_score,
+        'skill_coverage': round(skill_coverage * 100, 2) if skill_coverage is not None else None,
+        'top_terms': terms,
+        'matched_skills': matched,
+        'missing_skills': sorted(wanted - set(matched)),
+    }
+    with _explanations_lock:
+        _explanations[key] = result
+        if len(_explanations) > EXPLANATION_CACHE_SIZE:
+            _explanations.popitem(last=False)
+    return result
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+from database.job_catalog import job_catalog
+from models.resume_matcher import resume_file_path
+from models.scoring import resume_hash_known, score_paths
+from models.talent_index import talent_index
+from utils.cpu_pool import cpu_pool, parse_and_vectorize
+from utils.hashing import file_sha256
+
+# Background worker for the durable scoring queue (scoring_queue table).
+# Claims batches of queued applications, groups them by job and scores each
+# group in one batched call. Failures are retried with exponential backoff;
+# claims left behind by a crashed process are requeued after the lease expires.
+
+SCORING_BATCH_SIZE = int(os.getenv('SCORING_BATCH_SIZE', '64'))
+SCORING_POLL_SECONDS = float(os.getenv('SCORING_POLL_SECONDS', '1.0'))
+SCORING_MAX_ATTEMPTS = int(os.getenv('SCORING_MAX_ATTEMPTS', '5'))
+SCORING_RETRY_BACKOFF = float(os.getenv('SCORING_RETRY_BACKOFF', '5'))
+SCORING_LEASE_SECONDS = float(os.getenv('SCORING_LEASE_SECONDS', '600'))
+
+log = logging.getLogger(__name__)
+
+
+class ScoringWorker:
+    def __init__(self, db):
+        self.db = db
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def notify(self):
+        """Wake the worker now instead of at the next poll."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self):
+        last_recovery = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if loop.time() - last_recovery > SCORING_LEASE_SECONDS / 2:
+                    recovered = await asyncio.to_thread(self.db.recover_scoring_queue, SCORING_LEASE_SECONDS)
+                    if recovered:
+                        log.info("requeued %d unscored applications", recovered)
+                    last_recovery = loop.time()
+                batch = await asyncio.to_thread(self.db.claim_scoring_batch, SCORING_BATCH_SIZE)
+                if not batch:
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), SCORING_POLL_SECONDS)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                batch.sort(key=lambda item: item['job_id'])
+                for job_id, items in groupby(batch, key=lambda item: item['job_id']):
+                    await self._score_job(job_id, list(items))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("scoring worker iteration failed")
+                await asyncio.sleep(SCORING_POLL_SECONDS)
+
+    async def _score_job(self, job_id: int, items: List[Dict]):
+        ids = [item['application_id'] for item in items]
+        try:
+            job = await asyncio.to_thread(job_catalog.get, job_id)
+            if job is None:
+                await asyncio.to_thread(self.db.fail_scoring, ids, 'job no longer exists', 0, 0)
+                return
+            features, errors = await self._extract(items)
+            if errors:
+                # A resume that can't be parsed fails only the applications pointing at it
+                for path, e in errors.items():
+                    failed = [item['application_id'] for item in items if resume_file_path(item['resume_path']) == path]
+                    log.warning("parsing %s failed for %d applications: %s", path, len(failed), e)
+                    await asyncio.to_thread(self.db.fail_scoring, failed, str(e) or e.__class__.__name__,
+                                            SCORING_MAX_ATTEMPTS, SCORING_RETRY_BACKOFF)
+                items = [item for item in items if resume_file_path(item['resume_path']) not in errors]
+                ids = [item['application_id'] for item in items]
+            if items:
+                await asyncio.to_thread(self._score_and_complete, job, items, features)
+        except Exception as e:
+            log.warning("scoring job %s failed for %d applications: %s", job_id, len(ids), e)
+            await asyncio.to_thread(self.db.fail_scoring, ids, str(e) or e.__class__.__name__,
+                                    SCORING_MAX_ATTEMPTS, SCORING_RETRY_BACKOFF)
+
+    def _score_and_complete(self, job: Dict, items: List[Dict], features: Dict[str, tuple]):
+        paths = [resume_file_path(item['resume_path']) for item in items]
+        scores = score_paths(self.db, job, paths, features)
+        ids = [item['application_id'] for item in items]
+        # Scores and queue completion commit together, so an entry is never done without its score
+        with self.db.transaction():
+            self.db.set_application_scores(list(zip(ids, scores)))
+            self.db.complete_scoring(ids)
+
+    @staticmethod
+    def _needs_parse(path: str) -> Optional[str]:
+        """The file's hash if it must be parsed, else None. A stored vector is not
+        enough: recommendations and explanations store vectors for queued
+        applications too, without adding them to the talent index."""
+        if not os.path.exists(path):
+            return None
+        digest = file_sha256(path)
+        if resume_hash_known(path) and digest in talent_index:
+            return None
+        return digest
+
+    async def _extract(self, items: List[Dict]) -> Tuple[Dict[str, tuple], Dict[str, Exception]]:
+        """Parse resumes that have no stored vector yet or are missing from the talent
+        index, in the CPU pool, and add them to the talent index. Returns the features
+        and the error per path that failed."""
+        paths = {}
+        for item in items:
+            path = resume_file_path(item['resume_path'])
+            if path not in paths:
+                digest = await asyncio.to_thread(self._needs_parse, path)
+                if digest:
+                    paths[path] = (item, digest)
+        features = {}
+        errors = {}
+        pending = list(paths.items())
+        step = max(1, cpu_pool.workers)
+        for i in range(0, len(pending), step):
+            chunk = pending[i:i + step]
+            results = await asyncio.gather(*(cpu_pool.run(parse_and_vectorize, p) for p, _ in chunk), return_exceptions=True)
+            for (path, (item, digest)), result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    errors[path] = result
+                    continue
+                features[path] = result
+                text = result[0]
+                if text:
+                    owner = {k: item[k] for k in ('candidate_id', 'candidate_name', 'candidate_email')}
+                    await asyncio.to_thread(talent_index.add, digest, text, dict(owner, resume_path=path))
+        return features, errors
@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from database.db_manager import normalize_skill, split_skill_list
+
+# Skill extraction: every skill named in jobs.skills plus the alias table in
+# skill_aliases.json is compiled into one Aho-Corasick automaton, so a resume is
+# scanned once, in time linear in its length, regardless of how many skills exist.
+# New skills are pulled from the `skills` registry table (filled by create_job /
+# update_job) and inserted into the existing trie; the failure links are then
+# recomputed for the whole trie (a new pattern can change the links of existing
+# nodes), which is linear in its size and only happens when a skill is new.
+
+ALIASES_PATH = os.getenv('SKILL_ALIASES_PATH', os.path.join(os.path.dirname(__file__), 'skill_aliases.json'))
+SKILL_WEIGHT = float(os.getenv('SKILL_WEIGHT', '0.3'))
+
+
+class SkillAutomaton:
+    def __init__(self, aliases_path: str = ALIASES_PATH):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[Optional[Tuple[int, str]]] = [None]  # (pattern length, canonical skill) at terminals
+        self.fail: List[int] = [0]
+        self.dict_link: List[int] = [0]  # nearest terminal on the fail chain
+        self.canonical: Dict[str, str] = {}
+        self.max_id = 0  # highest skills.id folded in
+        self._lock = threading.Lock()
+        if os.path.exists(aliases_path):
+            with open(aliases_path) as f:
+                for canon, aliases in json.load(f).items():
+                    canon = normalize_skill(canon)
+                    self._insert(canon, canon)
+                    for alias in aliases:
+                        self._insert(alias, canon)
+        self._link()
+
+    def canonicalize(self, skill: str) -> str:
+        skill = normalize_skill(skill)
+        return self.canonical.get(skill, skill)
+
+    def canonical_set(self, skills: str) -> Set[str]:
+        return {self.canonicalize(s) for s in split_skill_list(skills)}
+
+    def _insert(self, pattern: str, canon: str) -> bool:
+        pattern = normalize_skill(pattern)
+        if not pattern or pattern in self.canonical:
+            return False
+        self.canonical[pattern] = canon
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.out.append(None)
+                self.goto[node][ch] = nxt
+            node = nxt
+        self.out[node] = (len(pattern), canon)
+        return True
+
+    def _link(self):
+        # Full BFS over the trie, O(number of nodes); cheap next to scanning resumes
+        fail = [0] * len(self.goto)
+        dict_link = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for ch, child in self.goto[node].items():
+                f = fail[node]
+                while f and ch not in self.goto[f]:
+                    f = fail[f]
+                fail[child] = self.goto[f].get(ch, 0)
+                dict_link[child] = fail[child] if self.out[fail[child]] else dict_link[fail[child]]
+                queue.append(child)
+        self.fail, self.dict_link = fail, dict_link
+
+    def add_skills(self, skills: Iterable[str]) -> bool:
+        with self._lock:
+            added = [self._insert(s, self.canonicalize(s)) for s in skills]
+            if any(added):
+                self._link()
+            return any(added)
+
+    def refresh(self, db):
+        """Fold in skills registered since the last refresh."""
+        rows = db.list_skills_since(self.max_id)
+        if rows:
+            self.add_skills(r['name'] for r in rows)
+            self.max_id = max(r['id'] for r in rows)
+
+    def scan(self, text: str) -> Set[str]:
+        """Canonical skills mentioned in text (whole-word matches only)."""
+        text = normalize_skill(text)
+        found = set()
+        with self._lock:
+            goto, fail, out, dict_link = self.goto, self.fail, self.out, self.dict_link
+            node = 0
+            last = len(text) - 1
+            for i, ch in enumerate(text):
+                while node and ch not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(ch, 0)
+                m = node if out[node] else dict_link[node]
+                while m:
+                    length, canon = out[m]
+                    start = i - length + 1
+                    if (start == 0 or not text[start - 1].isalnum()) and (i == last or not text[i + 1].isalnum()):
+                        found.add(canon)
+                    m = dict_link[m]
+        return found
+
+
+def coverage(wanted: Set[str], found: Set[str]) -> Optional[float]:
+    if not wanted:
+        return None
+    return len(wanted & found) / len(wanted)
+
+
+def blend(text_score: float, skill_coverage: Optional[float]) -> float:
+    """Suitability = TF-IDF similarity blended with the share of job skills found."""
+    if skill_coverage is None:
+        return round(text_score, 2)
+    return round((1 - SKILL_WEIGHT) * text_score + SKILL_WEIGHT * 100 * skill_coverage, 2)
+
+
+skill_automaton = SkillAutomaton()
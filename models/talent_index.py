@@ -0,0 +1,278 @@
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+# On-disk inverted index over every resume we have seen, for "best people in the
+# whole pool for this job" queries. Postings live in SQLite clustered by
+# (term, doc_id); queries use BM25 with MaxScore pruning, so long posting lists of
+# common terms are only probed for documents that can still enter the top k.
+
+INDEX_PATH = os.getenv('TALENT_INDEX_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'talent_index.db'))
+MAX_QUERY_TERMS = int(os.getenv('TALENT_MAX_QUERY_TERMS', '48'))
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r'(?u)\b\w\w+\b')
+
+INDEX_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS docs (
+        doc_id INTEGER PRIMARY KEY,
+        resume_hash TEXT UNIQUE NOT NULL,
+        length INTEGER NOT NULL,
+        candidate_id INTEGER,
+        candidate_name TEXT,
+        candidate_email TEXT,
+        resume_path TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS postings (
+        term TEXT NOT NULL,
+        doc_id INTEGER NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term, doc_id)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS terms (
+        term TEXT PRIMARY KEY,
+        df INTEGER NOT NULL,
+        max_tf INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value REAL NOT NULL
+    );
+    """,
+]
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in ENGLISH_STOP_WORDS]
+
+
+class _Cursor:
+    """Lazy doc-ordered iterator over one term's posting list."""
+
+    def __init__(self, conn: sqlite3.Connection, term: str):
+        self.rows = conn.execute('SELECT doc_id, tf FROM postings WHERE term = ? ORDER BY doc_id', (term,))
+        self.buffer = []
+        self.pos = 0
+        self.doc = None
+        self.tf = 0
+        self.next()
+
+    def next(self):
+        if self.pos == len(self.buffer):
+            self.buffer = self.rows.fetchmany(512)
+            self.pos = 0
+            if not self.buffer:
+                self.doc = None
+                return
+        self.doc, self.tf = self.buffer[self.pos]
+        self.pos += 1
+
+
+class TalentIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._lengths: Dict[int, int] = {}  # doc_id -> length, reloaded when docs were added elsewhere
+        for stmt in INDEX_SCHEMA:
+            self.conn.execute(stmt)
+        self.conn.commit()
+
+    def _stats(self) -> Dict[str, float]:
+        rows = self.conn.execute('SELECT key, value FROM meta').fetchall()
+        stats = {'n_docs': 0.0, 'total_len': 0.0, 'min_len': 0.0}
+        stats.update(dict(rows))
+        return stats
+
+    def __contains__(self, resume_hash: str) -> bool:
+        return self.conn.execute('SELECT 1 FROM docs WHERE resume_hash = ?', (resume_hash,)).fetchone() is not None
+
+    def add(self, resume_hash: str, text: str, candidate: Optional[Dict[str, Any]] = None):
+        """Index one resume. Re-adding a known hash only refreshes who owns it."""
+        candidate = candidate or {}
+        owner = (candidate.get('candidate_id'), candidate.get('candidate_name'),
+                 candidate.get('candidate_email'), candidate.get('resume_path'))
+        with self._lock, self.conn:
+            row = self.conn.execute('SELECT doc_id FROM docs WHERE resume_hash = ?', (resume_hash,)).fetchone()
+            if row:
+                self.conn.execute(
+                    'UPDATE docs SET candidate_id = ?, candidate_name = ?, candidate_email = ?, resume_path = ? WHERE doc_id = ?',
+                    (*owner, row[0])
+                )
+                return
+            counts = Counter(tokenize(text))
+            length = sum(counts.values())
+            cur = self.conn.execute(
+                'INSERT INTO docs (resume_hash, length, candidate_id, candidate_name, candidate_email, resume_path) VALUES (?,?,?,?,?,?)',
+                (resume_hash, length, *owner)
+            )
+            doc_id = cur.lastrowid
+            self.conn.executemany(
+                'INSERT INTO postings (term, doc_id, tf) VALUES (?,?,?)',
+                [(t, doc_id, tf) for t, tf in counts.items()]
+            )
+            self.conn.executemany(
+                '''INSERT INTO terms (term, df, max_tf) VALUES (?, 1, ?)
+                   ON CONFLICT(term) DO UPDATE SET df = df + 1, max_tf = MAX(max_tf, excluded.max_tf)''',
+                list(counts.items())
+            )
+            stats = self._stats()
+            min_len = length if not stats['n_docs'] else min(stats['min_len'], length)
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?,?)',
+                [('n_docs', stats['n_docs'] + 1), ('total_len', stats['total_len'] + length), ('min_len', min_len)]
+            )
+
+    def describe(self, resume_hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Candidate details for indexed resume hashes."""
+        out = {}
+        with self._lock:
+            for digest in resume_hashes:
+                row = self.conn.execute(
+                    'SELECT candidate_id, candidate_name, candidate_email FROM docs WHERE resume_hash = ?', (digest,)
+                ).fetchone()
+                if row:
+                    out[digest] = {'candidate_id': row[0], 'name': row[1], 'email': row[2]}
+        return out
+
+    def search(self, query: str, k: int = 50) -> List[Dict[str, Any]]:
+        """Top-k resumes by BM25 against query text, one entry per candidate."""
+        with self._lock:
+            stats = self._stats()
+            n_docs = stats['n_docs']
+            if not n_docs or k <= 0:
+                return []
+            avgdl = stats['total_len'] / n_docs or 1.0
+            min_norm = K1 * (1 - B + B * stats['min_len'] / avgdl)
+
+            terms = []
+            for term in set(tokenize(query)):
+                row = self.conn.execute('SELECT df, max_tf FROM terms WHERE term = ?', (term,)).fetchone()
+                if not row:
+                    continue
+                df, max_tf = row
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                ub = idf * max_tf * (K1 + 1) / (max_tf + min_norm)
+                terms.append((ub, idf, term))
+            # Keep the most selective terms; long job ads otherwise add dozens of filler words
+            terms = sorted(terms, reverse=True)[:MAX_QUERY_TERMS]
+            if not terms:
+                return []
+            terms.sort()  # ascending upper bound, as MaxScore expects
+            prefix = []
+            acc = 0.0
+            for ub, _, _ in terms:
+                acc += ub
+                prefix.append(acc)
+
+            # Other processes (bulk ingest, another worker) add documents to the same file
+            if len(self._lengths) != n_docs:
+                self._lengths = dict(self.conn.execute('SELECT doc_id, length FROM docs'))
+            lengths = self._lengths
+
+            def weight(idf: float, tf: int, dl: int) -> float:
+                return idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avgdl))
+
+            # Over-fetch a little so collapsing several resumes of one candidate still fills k
+            limit = k + max(10, k // 5)
+            cursors = [_Cursor(self.conn, term) for _, _, term in terms]
+            heap: List = []
+            threshold = 0.0
+            first_essential = 0
+            while True:
+                essential = [c for c in cursors[first_essential:] if c.doc is not None]
+                if not essential:
+                    break
+                cand = min(c.doc for c in essential)
+                dl = lengths.get(cand)
+                if dl is None:
+                    # Added after the reload above, while the postings were read
+                    dl = lengths[cand] = self.conn.execute('SELECT length FROM docs WHERE doc_id = ?', (cand,)).fetchone()[0]
+                score = 0.0
+                for i in range(first_essential, len(cursors)):
+                    c = cursors[i]
+                    if c.doc == cand:
+                        score += weight(terms[i][1], c.tf, dl)
+                        c.next()
+                # Non-essential terms: probe only while they could still lift the doc over the threshold
+                for i in range(first_essential - 1, -1, -1):
+                    if score + prefix[i] <= threshold:
+                        break
+                    row = self.conn.execute('SELECT tf FROM postings WHERE term = ? AND doc_id = ?', (terms[i][2], cand)).fetchone()
+                    if row:
+                        score += weight(terms[i][1], row[0], dl)
+                if len(heap) < limit:
+                    heapq.heappush(heap, (score, cand))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, cand))
+                if len(heap) == limit:
+                    threshold = heap[0][0]
+                    while first_essential < len(terms) and prefix[first_essential] <= threshold:
+                        first_essential += 1
+
+            ranked = sorted(heap, reverse=True)
+            results, seen = [], set()
+            for score, doc_id in ranked:
+                row = self.conn.execute(
+                    'SELECT resume_hash, candidate_id, candidate_name, candidate_email FROM docs WHERE doc_id = ?', (doc_id,)
+                ).fetchone()
+                owner = row[1] if row[1] is not None else row[0]
+                if owner in seen:
+                    continue
+                seen.add(owner)
+                results.append({
+                    'resume_hash': row[0],
+                    'candidate_id': row[1],
+                    'name': row[2],
+                    'email': row[3],
+                    'score': round(score, 4),
+                })
+                if len(results) == k:
+                    break
+            return results
+
+
+def build_from_db(db, index: Optional['TalentIndex'] = None) -> int:
+    """Index every resume referenced by an application that is not indexed yet."""
+    from models.resume_matcher import resume_file_path
+    from utils.hashing import file_sha256
+    from utils.resume_parser import parse_resume
+    index = index or talent_index
+    added = 0
+    for app in db.list_all_applications():
+        path = resume_file_path(app['resume_path'])
+        if not os.path.exists(path):
+            continue
+        digest = file_sha256(path)
+        owner = dict(app, resume_path=path)
+        if digest in index:
+            index.add(digest, '', owner)
+            continue
+        index.add(digest, parse_resume(path, digest), owner)
+        added += 1
+    return added
+
+
+talent_index = TalentIndex()
+
+
+if __name__ == '__main__':
+    # python -m models.talent_index  -> index resumes already in the database
+    from database.db_manager import DBManager
+    print(f"Indexed {build_from_db(DBManager())} new resumes into {INDEX_PATH}")
@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+DB_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
+STORE_DIR = os.getenv('VECTOR_STORE_DIR', os.path.join(DB_DIR, 'vectors'))
+
+_FILES = {
+    'data': ('data.f32', np.float32),
+    'indices': ('indices.i32', np.int32),
+    'indptr': ('indptr.i64', np.int64),
+}
+
+
+class VocabularyChanged(Exception):
+    """The matcher was refit (and the store reset) by another process since this
+    one loaded its model; restart it to load the new model."""
+    pass
+
+
+class ResumeVectorStore:
+    """Append-only store of resume term-count vectors keyed by the SHA-256 of the file.
+
+    Rows are kept as CSR components in three raw files that are memory-mapped for
+    reads; keys.txt holds one hash per row (and its row number) and paths.tsv maps upload paths to hashes.
+    Vectors are raw counts in the matcher vocabulary, so idf updates leave them valid;
+    a full refit (new vocabulary id) resets the store, after which processes still
+    holding the old model get VocabularyChanged instead of reading or appending rows.
+
+    Several processes (server workers, bulk ingest) may append to one store: appends
+    hold an flock on the store's lock file, a row's number is its position in the
+    on-disk indptr, and rows or paths appended elsewhere are picked up by re-reading
+    the tail of keys.txt / paths.tsv when a lookup misses.
+    """
+
+    def __init__(self, directory: str = STORE_DIR):
+        self.directory = directory
+        self.vocab_id: Optional[str] = None
+        self.n_features = 0
+        self.rows: Dict[str, int] = {}
+        self.paths: Dict[str, str] = {}
+        self._n_rows = 0     # lines of keys.txt read so far
+        self._keys_size = 0  # bytes of keys.txt / paths.tsv read so far
+        self._paths_size = 0
+        self._maps = None
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def open(self, vocab_id: str, n_features: int):
+        if self.vocab_id == vocab_id:
+            return self
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            meta = {}
+            if os.path.exists(self._path('meta.json')):
+                with open(self._path('meta.json')) as f:
+                    meta = json.load(f)
+            if meta.get('vocab_id') != vocab_id:
+                self._reset(vocab_id, n_features)
+            self.vocab_id = vocab_id
+            self.n_features = n_features
+            self.rows, self.paths = {}, {}
+            self._n_rows = self._keys_size = self._paths_size = 0
+            self._refresh()
+        return self
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._path('append.lock'), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _read_tail(self, name: str, offset: int):
+        """Complete lines appended to name since byte offset, and the new offset."""
+        path = self._path(name)
+        if os.path.getsize(path) == offset:
+            return [], offset
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read()
+        # A writer may be mid-line; leave the partial line for the next read
+        chunk = chunk[:chunk.rfind(b'\n') + 1]
+        return chunk.decode().splitlines(), offset + len(chunk)
+
+    def refresh(self):
+        """Pick up rows and paths appended by other processes."""
+        with self._lock:
+            self._refresh()
+
+    def _check_vocab(self):
+        with open(self._path('meta.json')) as f:
+            vocab_id = json.load(f).get('vocab_id')
+        if vocab_id != self.vocab_id:
+            raise VocabularyChanged(
+                f"vector store is now for model {vocab_id}, this process has {self.vocab_id}; restart it")
+
+    def _refresh(self):
+        """Pick up rows and paths appended by other processes (call with _lock held)."""
+        self._check_vocab()
+        if os.path.getsize(self._path('keys.txt')) < self._keys_size:
+            self.rows, self.paths = {}, {}
+            self._n_rows = self._keys_size = self._paths_size = 0
+        lines, self._keys_size = self._read_tail('keys.txt', self._keys_size)
+        for line in lines:
+            # "digest<TAB>row"; stores written before rows were recorded have the digest only
+            digest, _, row = line.strip().partition('\t')
+            self.rows.setdefault(digest, int(row) if row else self._n_rows)
+            self._n_rows += 1
+        if lines:
+            self._maps = None
+        lines, self._paths_size = self._read_tail('paths.tsv', self._paths_size)
+        for line in lines:
+            path, _, digest = line.rpartition('\t')
+            self.paths[path] = digest
+
+    def _reset(self, vocab_id: str, n_features: int):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        np.zeros(1, dtype=np.int64).tofile(self._path(_FILES['indptr'][0]))
+        for name in ('data', 'indices'):
+            open(self._path(_FILES[name][0]), 'wb').close()
+        open(self._path('keys.txt'), 'w').close()
+        open(self._path('paths.tsv'), 'w').close()
+        with open(self._path('meta.json'), 'w') as f:
+            json.dump({'vocab_id': vocab_id, 'n_features': n_features}, f)
+
+    def __contains__(self, digest: str) -> bool:
+        if digest in self.rows:
+            return True
+        with self._lock:
+            self._refresh()
+        return digest in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def hash_for_path(self, path: str) -> Optional[str]:
+        if path not in self.paths:
+            with self._lock:
+                self._refresh()
+        return self.paths.get(path)
+
+    def link_path(self, path: str, digest: str):
+        if self.paths.get(path) == digest:
+            return
+        with self._lock, self._file_lock():
+            with open(self._path('paths.tsv'), 'a') as f:
+                f.write(f"{path}\t{digest}\n")
+            self._refresh()
+
+    def add(self, digest: str, counts):
+        """Append one 1 x n_features row of term counts."""
+        if digest in self.rows:
+            return
+        row = sparse.csr_matrix(counts)
+        with self._lock, self._file_lock():
+            self._refresh()
+            if digest in self.rows:
+                return
+            # Row number and offset come from the files, which other processes also append to
+            indptr_path = self._path(_FILES['indptr'][0])
+            n = os.path.getsize(indptr_path) // 8
+            end = int(np.fromfile(indptr_path, dtype=np.int64, offset=(n - 1) * 8)[0])
+            with open(self._path(_FILES['data'][0]), 'ab') as f:
+                row.data.astype(np.float32).tofile(f)
+            with open(self._path(_FILES['indices'][0]), 'ab') as f:
+                row.indices.astype(np.int32).tofile(f)
+            with open(self._path(_FILES['indptr'][0]), 'ab') as f:
+                np.array([end + row.nnz], dtype=np.int64).tofile(f)
+            with open(self._path('keys.txt'), 'a') as f:
+                f.write(f"{digest}\t{n - 1}\n")
+            self._refresh()
+
+    def _mmap(self):
+        if self._maps is None:
+            maps = {}
+            for name, (fname, dtype) in _FILES.items():
+                path = self._path(fname)
+                if os.path.getsize(path):
+                    maps[name] = np.memmap(path, dtype=dtype, mode='r')
+                else:
+                    maps[name] = np.zeros(0, dtype=dtype)
+            self._maps = maps
+        return self._maps
+
+    def get_rows(self, digests: List[str]) -> sparse.csr_matrix:
+        """Stack the stored vectors for digests (all must be present)."""
+        if any(d not in self.rows for d in digests):
+            with self._lock:
+                self._refresh()
+        maps = self._mmap()
+        indptr, data, indices = maps['indptr'], maps['data'], maps['indices']
+        out_data, out_indices, out_indptr = [], [], [0]
+        for digest in digests:
+            i = self.rows[digest]
+            start, end = int(indptr[i]), int(indptr[i + 1])
+            out_data.append(np.asarray(data[start:end]))
+            out_indices.append(np.asarray(indices[start:end]))
+            out_indptr.append(out_indptr[-1] + end - start)
+        if not digests:
+            return sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+        return sparse.csr_matrix(
+            (np.concatenate(out_data), np.concatenate(out_indices), np.array(out_indptr)),
+            shape=(len(digests), self.n_features),
+        )
+
+
+vector_store = ResumeVectorStore()
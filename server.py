@@ -10,12 +10,10 @@ from itsdangerous import URLSafeSerializer
 from dotenv import load_dotenv
 import openai
 
-from database.db_manager import DBManager
+from database.db_manager import get_db
 from auth.login_manager import signup_start, signup_verify, login_start, login_verify, AuthError
 from auth.role_auth import require_role
 from utils.email_service import send_recruiter_message
-from utils.resume_parser import parse_resume
-from models.resume_matcher import matcher
 
 load_dotenv()
 
@@ -30,7 +28,7 @@ if OPENAI_KEY:
 else:
     OPENAI_MODEL = None
 
-db = DBManager()
+db = get_db()
 
     # ...existing code...
 import os
@@ -43,19 +41,33 @@ from fastapi.templating import Jinja2Templates
 from itsdangerous import URLSafeSerializer
 from dotenv import load_dotenv
 
-from database.db_manager import DBManager
+from database.db_manager import get_db
+from database.async_db import AsyncDB
+from database.job_catalog import job_catalog
 from auth.login_manager import signup_start, signup_verify, login_start, login_verify, AuthError
+from auth.otp_handler import otp_store
 from auth.role_auth import require_role
 from utils.email_service import send_recruiter_message
-from utils.resume_parser import parse_resume
-from models.resume_matcher import matcher
+from models.resume_matcher import resume_file_path
+from models.scoring import nearest_resumes, explain
+from models.talent_index import talent_index
+from models.recommender import recommender
+from utils.cpu_pool import cpu_pool
+from utils.uploads import check_extension, UploadRejected
+from utils.blob_store import blob_store
+from models.scoring_worker import ScoringWorker
 
 load_dotenv()
 
 SECRET = os.getenv("APP_SECRET", "dev-secret")
 serializer = URLSafeSerializer(SECRET, salt="session")
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "20"))  # default page size of paged list endpoints
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
 
-db = DBManager()
+db = get_db()
+# Route handlers use adb (awaitable, runs on the DB threads); db is for sync code
+adb = AsyncDB(db)
+scoring_worker = ScoringWorker(db)
 app = FastAPI(title="AI Recruitment Portal")
 
 # Static & templates
@@ -65,18 +77,42 @@ templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
 
 # ---------------------- Helpers ----------------------
 
-def get_user_from_cookie(request: Request):
+async def get_user_from_cookie(request: Request):
     token = request.cookies.get("session")
     if not token:
         return None
     try:
         data = serializer.loads(token)
-        user = db.get_user_by_email(data.get("email"))
+        user = await adb.get_user_by_email(data.get("email"))
         return user
     except Exception:
         return None
 
 
+def record_application(digest: str, dest: str, size: int, **fields) -> int:
+    # Blob reference, application row and scoring queue entry commit together
+    # (sync: call through adb.run so the whole unit of work stays on one DB thread)
+    with db.transaction():
+        db.register_blob(digest, dest, size)
+        app_id = db.apply_to_job(resume_path=dest, **fields)
+        db.enqueue_scoring([(app_id, fields["job_id"])])
+    return app_id
+
+
+async def get_owned_job(job_id: int, recruiter_id: int) -> Optional[dict]:
+    # From the in-process job catalog: no query unless the jobs table changed
+    job = await adb.run(job_catalog.get, job_id)
+    return job if job and job["recruiter_id"] == recruiter_id else None
+
+
+def update_job_and_rescore(job_id: int, recruiter_id: int, *args, **kwargs) -> Optional[int]:
+    """Number of applicants queued for rescoring, or None if the job isn't the recruiter's."""
+    with db.transaction():
+        if not db.update_job(job_id, recruiter_id, *args, **kwargs):
+            return None
+        return db.enqueue_job_rescore(job_id)
+
+
 def set_session(response: RedirectResponse, user):
     token = serializer.dumps({"email": user["email"], "role": user["role"]})
     response.set_cookie("session", token, httponly=True, max_age=60*60*8)
@@ -106,7 +142,7 @@ def validate_csrf(request: Request, csrf_token: str) -> bool:
 # ---------------------- Landing ----------------------
 @app.get("/", response_class=HTMLResponse)
 async def landing(request: Request):
-    resp = templates.TemplateResponse("landing.html", {"request": request, "user": get_user_from_cookie(request)})
+    resp = templates.TemplateResponse("landing.html", {"request": request, "user": await get_user_from_cookie(request)})
     # Ensure CSRF token cookie exists for forms on landing modal
     if not request.cookies.get("csrf"):
         resp.set_cookie("csrf", secrets.token_urlsafe(32), httponly=False, samesite="lax")
@@ -123,8 +159,8 @@ async def logout(request: Request):
 @app.get("/recruiter", response_class=HTMLResponse)
 async def recruiter_page_legacy(request: Request):
     # legacy page kept; link new dashboard route below
-    user = get_user_from_cookie(request)
-    jobs = db.list_jobs_by_recruiter(user["id"]) if user and user["role"] == "recruiter" else []
+    user = await get_user_from_cookie(request)
+    jobs = await adb.list_jobs_by_recruiter(user["id"]) if user and user["role"] == "recruiter" else []
     resp = templates.TemplateResponse("recruiter.html", {"request": request, "user": user, "jobs": jobs, "applicants": None})
     if not request.cookies.get("csrf"):
         resp.set_cookie("csrf", secrets.token_urlsafe(32), httponly=False, samesite="lax")
@@ -132,7 +168,7 @@ async def recruiter_page_legacy(request: Request):
 
 @app.get("/recruiter/dashboard", response_class=HTMLResponse)
 async def recruiter_dashboard(request: Request):
-    resp = templates.TemplateResponse("recruiter_dashboard.html", {"request": request, "user": get_user_from_cookie(request)})
+    resp = templates.TemplateResponse("recruiter_dashboard.html", {"request": request, "user": await get_user_from_cookie(request)})
     if not request.cookies.get("csrf"):
         resp.set_cookie("csrf", secrets.token_urlsafe(32), httponly=False, samesite="lax")
     return resp
@@ -142,7 +178,7 @@ async def recruiter_signup(request: Request, name: str = Form(...), email: str =
     if not validate_csrf(request, csrf_token):
         return RedirectResponse("/?error=Invalid+CSRF", status_code=302)
     try:
-        signup_start(name=name, email=email, password=password, role="recruiter")
+        await asyncio.to_thread(signup_start, name=name, email=email, password=password, role="recruiter")
         # store temp in cookie-like memory using signed token
         token = serializer.dumps({"pending_email": email, "pending_password": password, "pending_name": name, "mode": "signup", "role": "recruiter"})
         resp = RedirectResponse("/recruiter", status_code=302)
@@ -156,7 +192,7 @@ async def recruiter_login(request: Request, email: str = Form(...), password: st
     if not validate_csrf(request, csrf_token):
         return RedirectResponse("/?error=Invalid+CSRF", status_code=302)
     try:
-        login_start(email=email)
+        await asyncio.to_thread(login_start, email=email)
         token = serializer.dumps({"pending_email": email, "pending_password": password, "mode": "login", "role": "recruiter"})
         resp = RedirectResponse("/recruiter", status_code=302)
         resp.set_cookie("pending", token, max_age=300, httponly=True)
@@ -170,10 +206,10 @@ async def recruiter_verify(request: Request, email: str = Form(...), code: str =
         return RedirectResponse("/?error=Invalid+CSRF", status_code=302)
     try:
         if mode == "signup":
-            signup_verify(name=name, email=email, password=password, role="recruiter", code=code)
+            await asyncio.to_thread(signup_verify, name=name, email=email, password=password, role="recruiter", code=code)
         else:
-            user = login_verify(email=email, password=password, code=code)
-        user = db.get_user_by_email(email)
+            user = await asyncio.to_thread(login_verify, email=email, password=password, code=code)
+        user = await adb.get_user_by_email(email)
         redirect_to = next_page or "/recruiter"
         resp = RedirectResponse(redirect_to, status_code=302)
         set_session(resp, user)
@@ -184,21 +220,21 @@ async def recruiter_verify(request: Request, email: str = Form(...), code: str =
 
 @app.post("/recruiter/post")
 async def post_job(request: Request, title: str = Form(...), skills: str = Form(""), experience: str = Form(""), description: str = Form(...), csrf_token: str = Form(...)):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not validate_csrf(request, csrf_token):
         return RedirectResponse("/recruiter?error=Invalid+CSRF", status_code=302)
     if not require_role(user, "recruiter"):
         return RedirectResponse("/recruiter?error=Not+authorized", status_code=302)
-    db.create_job(recruiter_id=user["id"], title=title.strip(), description=description.strip(), skills=skills.strip(), experience=experience.strip())
+    await adb.create_job(recruiter_id=user["id"], title=title.strip(), description=description.strip(), skills=skills.strip(), experience=experience.strip())
     return RedirectResponse("/recruiter?flash=Job+posted", status_code=302)
 
 @app.get("/recruiter/applicants", response_class=HTMLResponse)
 async def recruiter_applicants(request: Request, job_id: int):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return RedirectResponse("/recruiter?error=Not+authorized", status_code=302)
-    jobs = db.list_jobs_by_recruiter(user["id"])
-    applicants = db.list_applicants_for_job(job_id)
+    jobs = await adb.list_jobs_by_recruiter(user["id"])
+    applicants = await adb.list_applicants_for_job(job_id)
     resp = templates.TemplateResponse("recruiter.html", {"request": request, "user": user, "jobs": jobs, "applicants": applicants})
     if not request.cookies.get("csrf"):
         resp.set_cookie("csrf", secrets.token_urlsafe(32), httponly=False, samesite="lax")
@@ -214,9 +250,9 @@ async def recruiter_message(request: Request, email: str = Form(...), job_title:
 # ---------------------- Candidate Pages & Auth ----------------------
 @app.get("/candidate", response_class=HTMLResponse)
 async def candidate_page_legacy(request: Request):
-    user = get_user_from_cookie(request)
-    jobs = db.list_jobs()
-    applications = db.list_user_applications(user["id"]) if user and user["role"] == "candidate" else []
+    user = await get_user_from_cookie(request)
+    jobs = await adb.run(job_catalog.all)
+    applications = await adb.list_user_applications(user["id"]) if user and user["role"] == "candidate" else []
     resp = templates.TemplateResponse("candidate.html", {"request": request, "user": user, "jobs": jobs, "applications": applications})
     if not request.cookies.get("csrf"):
         resp.set_cookie("csrf", secrets.token_urlsafe(32), httponly=False, samesite="lax")
@@ -224,7 +260,7 @@ async def candidate_page_legacy(request: Request):
 
 @app.get("/candidate/dashboard", response_class=HTMLResponse)
 async def candidate_dashboard(request: Request):
-    resp = templates.TemplateResponse("candidate_dashboard.html", {"request": request, "user": get_user_from_cookie(request)})
+    resp = templates.TemplateResponse("candidate_dashboard.html", {"request": request, "user": await get_user_from_cookie(request)})
     if not request.cookies.get("csrf"):
         resp.set_cookie("csrf", secrets.token_urlsafe(32), httponly=False, samesite="lax")
     return resp
@@ -234,7 +270,7 @@ async def candidate_signup(request: Request, name: str = Form(...), email: str =
     if not validate_csrf(request, csrf_token):
         return RedirectResponse("/?error=Invalid+CSRF", status_code=302)
     try:
-        signup_start(name=name, email=email, password=password, role="candidate")
+        await asyncio.to_thread(signup_start, name=name, email=email, password=password, role="candidate")
         token = serializer.dumps({"pending_email": email, "pending_password": password, "pending_name": name, "mode": "signup", "role": "candidate"})
         resp = RedirectResponse("/candidate", status_code=302)
         resp.set_cookie("pending", token, max_age=300, httponly=True)
@@ -247,7 +283,7 @@ async def candidate_login(request: Request, email: str = Form(...), password: st
     if not validate_csrf(request, csrf_token):
         return RedirectResponse("/?error=Invalid+CSRF", status_code=302)
     try:
-        login_start(email=email)
+        await asyncio.to_thread(login_start, email=email)
         token = serializer.dumps({"pending_email": email, "pending_password": password, "mode": "login", "role": "candidate"})
         resp = RedirectResponse("/candidate", status_code=302)
         resp.set_cookie("pending", token, max_age=300, httponly=True)
@@ -261,10 +297,10 @@ async def candidate_verify(request: Request, email: str = Form(...), code: str =
         return RedirectResponse("/?error=Invalid+CSRF", status_code=302)
     try:
         if mode == "signup":
-            signup_verify(name=name, email=email, password=password, role="candidate", code=code)
+            await asyncio.to_thread(signup_verify, name=name, email=email, password=password, role="candidate", code=code)
         else:
-            login_verify(email=email, password=password, code=code)
-        user = db.get_user_by_email(email)
+            await asyncio.to_thread(login_verify, email=email, password=password, code=code)
+        user = await adb.get_user_by_email(email)
         redirect_to = next_page or "/candidate"
         resp = RedirectResponse(redirect_to, status_code=302)
         set_session(resp, user)
@@ -275,23 +311,20 @@ async def candidate_verify(request: Request, email: str = Form(...), code: str =
 
 @app.post("/candidate/apply")
 async def candidate_apply(request: Request, job_id: int = Form(...), full_name: str = Form(...), email: str = Form(...), resume: UploadFile = File(...), csrf_token: str = Form(...)):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not validate_csrf(request, csrf_token):
         return RedirectResponse("/candidate?error=Invalid+CSRF", status_code=302)
     if not require_role(user, "candidate"):
         return RedirectResponse("/candidate?error=Not+authorized", status_code=302)
-    upload_dir = os.path.join(BASE_DIR, "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    ext = os.path.splitext(resume.filename)[1]
-    dest = os.path.join(upload_dir, f"{user['id']}_job{job_id}{ext}")
-    with open(dest, "wb") as f:
-        f.write(await resume.read())
-    app_id = db.apply_to_job(job_id=job_id, candidate_id=user['id'], candidate_name=full_name, candidate_email=email, resume_path=dest)
-    resume_text = parse_resume(dest)
-    job = [j for j in db.list_jobs() if j['id']==job_id]
-    jd = job[0]['description'] if job else ''
-    score = matcher.score(jd, [resume_text])[0] if resume_text else 0.0
-    db.set_application_score(app_id, score)
+    if not await adb.run(job_catalog.get, job_id):
+        return RedirectResponse("/candidate?error=Job+not+found", status_code=302)
+    try:
+        ext = check_extension(resume.filename)
+        dest, digest, size = await blob_store.put_upload(resume, ext)
+    except UploadRejected as e:
+        return RedirectResponse(f"/candidate?error={e}", status_code=302)
+    await adb.run(record_application, digest, dest, size, job_id=job_id, candidate_id=user['id'], candidate_name=full_name, candidate_email=email)
+    scoring_worker.notify()
     return RedirectResponse("/candidate?flash=Applied", status_code=302)
 
 # ---------------------- JSON APIs for Frontend Fetch ----------------------
@@ -302,9 +335,9 @@ async def api_auth_start(request: Request, response: Response, mode: str = Form(
         return {"ok": False, "error": "Invalid CSRF"}
     try:
         if mode == "signup":
-            signup_start(name=name, email=email, password=password, role=role)
+            await asyncio.to_thread(signup_start, name=name, email=email, password=password, role=role)
         else:
-            login_start(email=email)
+            await asyncio.to_thread(login_start, email=email)
         # pending info for verify convenience (cookie set like web flow)
         token = serializer.dumps({"pending_email": email, "pending_password": password, "pending_name": name, "mode": mode, "role": role})
         response.set_cookie("pending", token, max_age=300, httponly=True)
@@ -318,89 +351,53 @@ async def api_auth_verify(request: Request, response: Response, mode: str = Form
         return {"ok": False, "error": "Invalid CSRF"}
     try:
         if mode == "signup":
-            signup_verify(name=name, email=email, password=password, role=role, code=code)
+            await asyncio.to_thread(signup_verify, name=name, email=email, password=password, role=role, code=code)
         else:
-            login_verify(email=email, password=password, code=code)
-        user = db.get_user_by_email(email)
+            await asyncio.to_thread(login_verify, email=email, password=password, code=code)
+        user = await adb.get_user_by_email(email)
         set_session(response, user)
         return {"ok": True, "role": user["role"]}
     except AuthError as e:
         return {"ok": False, "error": str(e)}
 
 @app.get("/api/jobs")
-async def api_jobs(request: Request):
-    jobs = db.list_jobs()
-    # Parse company name from description for display
+async def api_jobs(request: Request, q: str = "", location: str = "", category: str = "", type: str = "",
+                   limit: int = None, cursor: str = None, fields: str = "summary"):
+    # With no parameters the whole catalog is returned with descriptions (older clients);
+    # otherwise a BM25-ranked page from jobs_fts (newest first without q) plus next_cursor
+    next_cursor = None
+    if not (q or location or category or type) and limit is None and cursor is None:
+        jobs = await adb.run(job_catalog.all)
+    else:
+        try:
+            jobs, next_cursor = await adb.search_jobs(q, location.strip() or None, category.strip() or None, type.strip() or None,
+                                                      max(1, min(limit or PAGE_SIZE, PAGE_SIZE_MAX)), cursor, fields)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
     for job in jobs:
-        if job.get("description"):
-            desc = job["description"]
-            if desc.startswith("Company: "):
-                lines = desc.split('\n')
-                company_line = lines[0]
-                job["company_name"] = company_line.replace("Company: ", "").strip()
-                # Extract other fields if present
-                remaining_desc = '\n'.join(lines[2:]) if len(lines) > 2 else desc
-                for line in lines:
-                    if line.startswith("Job Type: "):
-                        job["type"] = line.replace("Job Type: ", "").strip()
-                    elif line.startswith("Location: "):
-                        job["location"] = line.replace("Location: ", "").strip()
-                    elif line.startswith("Salary: "):
-                        job["salary"] = line.replace("Salary: ", "").strip()
-                    elif line.startswith("Category: "):
-                        job["category"] = line.replace("Category: ", "").strip()
-            else:
-                job["company_name"] = "Company Name"
-        else:
-            job["company_name"] = "Company Name"
-    return {"ok": True, "jobs": jobs}
+        job["company_name"] = job.get("company_name") or "Company Name"
+    return {"ok": True, "jobs": jobs, "next_cursor": next_cursor}
 
 @app.get("/api/recruiter/jobs")
 async def api_recruiter_jobs(request: Request):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    jobs = db.list_jobs_by_recruiter(user["id"])
-    # Add application count for each job
+    jobs = await adb.list_jobs_with_counts(user["id"])
     for job in jobs:
-        job["application_count"] = len(db.list_applicants_for_job(job["id"]))
-        if job.get("description"):
-            desc = job["description"]
-            if desc.startswith("Company: "):
-                lines = desc.split('\n')
-                company_line = lines[0]
-                job["company_name"] = company_line.replace("Company: ", "").strip()
-            else:
-                job["company_name"] = "Company Name"
-        else:
-            job["company_name"] = "Company Name"
+        job["company_name"] = job.get("company_name") or "Company Name"
     return {"ok": True, "jobs": jobs}
 
 @app.get("/api/recruiter/applications")
 async def api_recruiter_applications(request: Request, job_id: int = None):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    recruiter_jobs = db.list_jobs_by_recruiter(user["id"])
-    job_ids = [job["id"] for job in recruiter_jobs]
-    all_applications = []
-    for jid in job_ids:
-        try:
-            job_applications = db.list_applicants_for_job(jid)
-            for app in job_applications:
-                app["job_id"] = jid
-                job_info = next((job for job in recruiter_jobs if job["id"] == jid), {})
-                app["job_title"] = job_info.get("title", "Unknown Job")
-                # Parse similarity_score as float, fallback to 0.0
-                try:
-                    app["similarity_score"] = float(app.get("suitability_score", 0.0))
-                except Exception:
-                    app["similarity_score"] = 0.0
-                # Add resume_path for download
-                app["resume_path"] = app.get("resume_path", "")
-                all_applications.append(app)
-        except Exception as e:
-            continue
+    all_applications = await adb.list_applications_for_recruiter(user["id"], job_id)
+    for app in all_applications:
+        app["job_title"] = app.get("job_title") or "Unknown Job"
+        app["similarity_score"] = float(app.get("suitability_score") or 0.0)
+        app["resume_path"] = app.get("resume_path") or ""
     return {"ok": True, "applications": all_applications}
 
 @app.post("/api/recruiter/jobs")
@@ -416,19 +413,12 @@ async def api_recruiter_post_job(request: Request,
                                 category: str = Form("")):
     if not validate_csrf(request, request.headers.get("X-CSRF-Token", "")):
         return {"ok": False, "error": "Invalid CSRF"}
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    
-    # Create job with additional fields - include all info in description until DB schema is updated
-    enhanced_description = description.strip()
-    if company_name: enhanced_description = f"Company: {company_name}\n\n" + enhanced_description
-    if type: enhanced_description += f"\n\nJob Type: {type}"
-    if location: enhanced_description += f"\nLocation: {location}"  
-    if salary: enhanced_description += f"\nSalary: {salary}"
-    if category: enhanced_description += f"\nCategory: {category}"
-    
-    job_id = db.create_job(user["id"], title.strip(), enhanced_description, skills.strip(), experience.strip())
+    job_id = await adb.create_job(user["id"], title.strip(), description.strip(), skills.strip(), experience.strip(),
+                           company_name=company_name.strip(), job_type=type.strip(), location=location.strip(),
+                           salary=salary.strip(), category=category.strip())
     return {"ok": True, "job_id": job_id, "company_name": company_name.strip()}
 
 @app.put("/api/recruiter/jobs/{job_id}")
@@ -443,30 +433,26 @@ async def api_recruiter_update_job(request: Request, job_id: int,
                                   category: str = Form("")):
     if not validate_csrf(request, request.headers.get("X-CSRF-Token", "")):
         return {"ok": False, "error": "Invalid CSRF"}
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    
-    # Include additional info in description until DB is updated
-    enhanced_description = description.strip()
-    if type: enhanced_description += f"\n\nJob Type: {type}"
-    if location: enhanced_description += f"\nLocation: {location}"  
-    if salary: enhanced_description += f"\nSalary: {salary}"
-    if category: enhanced_description += f"\nCategory: {category}"
-    
-    ok = db.update_job(job_id, user["id"], title.strip(), enhanced_description, skills.strip(), experience.strip())
-    if not ok:
+    # Applicants are rescored by the background worker in one batch; scores are
+    # memoized per job version, so only changed content is recomputed
+    queued = await adb.run(update_job_and_rescore, job_id, user["id"], title.strip(), description.strip(), skills.strip(), experience.strip(),
+                           job_type=type.strip(), location=location.strip(), salary=salary.strip(), category=category.strip())
+    if queued is None:
         return {"ok": False, "error": "Job not found or not owned by user"}
-    return {"ok": True}
+    scoring_worker.notify()
+    return {"ok": True, "rescoring": queued}
 
 @app.delete("/api/recruiter/jobs/{job_id}")
 async def api_recruiter_delete_job(request: Request, job_id: int):
     if not validate_csrf(request, request.headers.get("X-CSRF-Token", "")):
         return {"ok": False, "error": "Invalid CSRF"}
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    ok = db.delete_job(job_id, user["id"])
+    ok = await adb.delete_job(job_id, user["id"])
     if not ok:
         return {"ok": False, "error": "Job not found or not owned by user"}
     return {"ok": True}
@@ -486,34 +472,67 @@ async def api_candidate_apply(
 ):
     if not validate_csrf(request, request.headers.get("X-CSRF-Token", "")):
         return {"ok": False, "error": "Invalid CSRF"}
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
+    if not require_role(user, "candidate"):
+        return {"ok": False, "error": "Not authorized"}
+    if not await adb.run(job_catalog.get, job_id):
+        return {"ok": False, "error": "Job not found"}
+    try:
+        ext = check_extension(resume.filename)
+        dest, digest, size = await blob_store.put_upload(resume, ext)
+    except UploadRejected as e:
+        return {"ok": False, "error": str(e)}
+    # Scored in the background; poll /api/candidate/applications/{id}/status
+    app_id = await adb.run(record_application, digest, dest, size, job_id=job_id, candidate_id=user['id'], candidate_name=full_name,
+                           candidate_email=email, phone=phone, experience=experience, skills=skills,
+                           expected_salary=expected_salary, cover_letter=cover_letter)
+    scoring_worker.notify()
+    return {"ok": True, "application_id": app_id, "status": "queued"}
+
+@app.get("/api/candidate/applications/{application_id}/status")
+async def api_candidate_application_status(request: Request, application_id: int):
+    user = await get_user_from_cookie(request)
+    if not user:
+        return {"ok": False, "error": "Not authorized"}
+    status = await adb.get_scoring_status(application_id)
+    if not status or (user["role"] == "candidate" and status["candidate_id"] != user["id"]):
+        return {"ok": False, "error": "Application not found"}
+    if user["role"] == "recruiter":
+        application = await adb.get_application_by_id(application_id)
+        if not application or application.get("recruiter_id") != user["id"]:
+            return {"ok": False, "error": "Application not found"}
+    state = status["status"] or ("done" if status["score"] is not None else "unknown")
+    return {"ok": True, "application_id": application_id, "status": state, "score": status["score"],
+            "attempts": status["attempts"] or 0, "error": status["last_error"]}
+
+@app.get("/api/recruiter/scoring/metrics")
+async def api_recruiter_scoring_metrics(request: Request):
+    user = await get_user_from_cookie(request)
+    if not require_role(user, "recruiter"):
+        return {"ok": False, "error": "Not authorized"}
+    return {"ok": True, "metrics": await adb.scoring_queue_metrics(), "cpu_pool_pending": cpu_pool.pending}
+
+@app.get("/api/candidate/recommendations")
+async def api_candidate_recommendations(request: Request, k: int = 10):
+    user = await get_user_from_cookie(request)
     if not require_role(user, "candidate"):
         return {"ok": False, "error": "Not authorized"}
-    upload_dir = os.path.join(BASE_DIR, "uploads")
-    os.makedirs(upload_dir, exist_ok=True)
-    ext = os.path.splitext(resume.filename)[1]
-    dest = os.path.join(upload_dir, f"{user['id']}_job{job_id}{ext}")
-    with open(dest, "wb") as f:
-        f.write(await resume.read())
-    # Store all fields in the applications table if possible, or as extra fields in the DB if schema allows
-    # For now, store extra fields in the resume_path as a workaround (or extend DB schema if needed)
-    # This is a workaround for legacy schema
-    extra_info = f"phone:{phone}|exp:{experience}|skills:{skills}|salary:{expected_salary}|cover:{cover_letter}"
-    resume_path_with_info = dest + "::" + extra_info
-    app_id = db.apply_to_job(job_id=job_id, candidate_id=user['id'], candidate_name=full_name, candidate_email=email, resume_path=resume_path_with_info)
-    resume_text = parse_resume(dest)
-    job = [j for j in db.list_jobs() if j['id']==job_id]
-    jd = job[0]['description'] if job else ''
-    score = matcher.score(jd, [resume_text])[0] if resume_text else 0.0
-    db.set_application_score(app_id, score)
-    return {"ok": True, "application_id": app_id, "score": score}
+    k = max(1, min(k, 50))
+    return {"ok": True, "jobs": await adb.run(recommender.recommend, db, user["id"], k)}
 
 @app.get("/api/recruiter/ranking")
-async def api_recruiter_ranking(request: Request):
-    user = get_user_from_cookie(request)
+async def api_recruiter_ranking(request: Request, job_id: int = None, limit: int = None, cursor: str = None):
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    data = db.list_ranked_candidates_for_recruiter(user["id"])
+    next_cursor = None
+    if limit is None and cursor is None and job_id is None:
+        data = await adb.list_ranked_candidates_for_recruiter(user["id"])
+    else:
+        try:
+            data, next_cursor = await adb.list_ranked_candidates_page(user["id"], max(1, min(limit or PAGE_SIZE, PAGE_SIZE_MAX)), cursor, job_id)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
     # normalize payload for frontend
     candidates = [
         {
@@ -526,49 +545,83 @@ async def api_recruiter_ranking(request: Request):
         }
         for row in data
     ]
-    return {"ok": True, "candidates": candidates}
+    return {"ok": True, "candidates": candidates, "next_cursor": next_cursor}
+
+@app.get("/api/recruiter/ranking/top")
+async def api_recruiter_ranking_top(request: Request, k: int = 5):
+    user = await get_user_from_cookie(request)
+    if not require_role(user, "recruiter"):
+        return {"ok": False, "error": "Not authorized"}
+    k = max(1, min(k, 50))
+    jobs = {}
+    for row in await adb.top_candidates_per_job(user["id"], k):
+        job = jobs.setdefault(row["job_id"], {"job_id": row["job_id"], "job_title": row["job_title"], "candidates": []})
+        job["candidates"].append({
+            "id": row["application_id"],
+            "name": row["name"],
+            "email": row["email"],
+            "score": round(float(row["score"]), 2),
+            "rank": row["rank"],
+        })
+    return {"ok": True, "jobs": list(jobs.values())}
+
+@app.get("/api/recruiter/jobs/{job_id}/applicants")
+async def api_recruiter_job_applicants(request: Request, job_id: int, limit: int = None, cursor: str = None, fields: str = "summary"):
+    user = await get_user_from_cookie(request)
+    if not require_role(user, "recruiter"):
+        return {"ok": False, "error": "Not authorized"}
+    if not await get_owned_job(job_id, user["id"]):
+        return {"ok": False, "error": "Job not found or not owned by user"}
+    try:
+        applicants, next_cursor = await adb.list_applicants_page(job_id, max(1, min(limit or PAGE_SIZE, PAGE_SIZE_MAX)), cursor, fields)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, "applicants": applicants, "next_cursor": next_cursor}
+
+@app.get("/api/recruiter/talent-search")
+async def api_recruiter_talent_search(request: Request, job_id: int = None, q: str = "", k: int = 50, mode: str = "exact"):
+    user = await get_user_from_cookie(request)
+    if not require_role(user, "recruiter"):
+        return {"ok": False, "error": "Not authorized"}
+    if job_id is not None:
+        job = await get_owned_job(job_id, user["id"])
+        if not job:
+            return {"ok": False, "error": "Job not found or not owned by user"}
+        q = f"{job['title']} {job.get('skills') or ''} {job['description']}"
+    if not q.strip():
+        return {"ok": False, "error": "Provide job_id or q"}
+    k = max(1, min(k, 200))
+    if mode == "dense":
+        hits = await adb.run(nearest_resumes, q, k)
+        if hits:
+            owners = await adb.run(talent_index.describe, [h for h, _ in hits])
+            candidates = [dict(owners.get(h, {}), resume_hash=h, score=round(sim * 100, 2)) for h, sim in hits]
+            return {"ok": True, "mode": "dense", "candidates": candidates}
+    return {"ok": True, "mode": "exact", "candidates": await adb.run(talent_index.search, q, k)}
 
 @app.get("/api/recruiter/stats")
 async def api_recruiter_stats(request: Request):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
-    
-    # Get recruiter's job statistics
-    jobs = db.list_jobs_by_recruiter(user["id"])
-    active_jobs = len([j for j in jobs if j.get('status') != 'closed'])
-    
-    # Get application statistics
-    all_applications = []
-    total_applications = 0
-    pending_reviews = 0
-    hired_candidates = 0
-    
-    try:
-        # Get applications for all recruiter's jobs
-        for job in jobs:
-            job_applications = db.list_applicants_for_job(job["id"])
-            all_applications.extend(job_applications)
-            total_applications += len(job_applications)
-            pending_reviews += len([app for app in job_applications if not app.get('status') or app.get('status') == 'pending'])
-            hired_candidates += len([app for app in job_applications if app.get('status') == 'hired'])
-    except Exception as e:
-        # Fallback if db methods don't exist
-        pass
-    
+    # One grouped query: totals, status funnel and per-job score summaries
+    stats = await adb.recruiter_stats(user["id"])
     return {
         "ok": True,
         "stats": {
-            "activeJobs": active_jobs,
-            "totalApplications": total_applications,
-            "pendingReviews": pending_reviews,
-            "hiredCandidates": hired_candidates
+            "activeJobs": stats["jobs"],
+            "totalApplications": stats["applications"],
+            "pendingReviews": stats["funnel"].get("pending", 0),
+            "hiredCandidates": stats["funnel"].get("hired", 0),
+            "averageScore": stats["avg_score"],
+            "funnel": stats["funnel"],
+            "jobs": stats["per_job"],
         }
     }
 
 @app.get("/api/recruiter/applications/{application_id}")
 async def api_recruiter_application_details(request: Request, application_id: int):
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, "recruiter"):
         return {"ok": False, "error": "Not authorized"}
     
@@ -591,6 +644,20 @@ async def api_recruiter_application_details(request: Request, application_id: in
     except Exception as e:
         return {"ok": False, "error": "Application not found"}
 
+@app.get("/api/recruiter/applications/{application_id}/explanation")
+async def api_recruiter_application_explanation(request: Request, application_id: int, top: int = 10):
+    user = await get_user_from_cookie(request)
+    if not require_role(user, "recruiter"):
+        return {"ok": False, "error": "Not authorized"}
+    application = await adb.get_application_by_id(application_id)
+    if not application or application.get("recruiter_id") != user["id"]:
+        return {"ok": False, "error": "Application not found"}
+    job = await get_owned_job(application["job_id"], user["id"])
+    explanation = await adb.run(explain, db, job, resume_file_path(application.get("resume_path")), max(1, min(top, 50))) if job else None
+    if not explanation:
+        return {"ok": False, "error": "No stored resume vector for this application"}
+    return {"ok": True, "explanation": explanation}
+
 @app.post("/api/recruiter/send-email")
 async def api_recruiter_send_email(request: Request):
     # Read form data (support both 'email_type' and legacy 'type')
@@ -608,12 +675,12 @@ async def api_recruiter_send_email(request: Request):
     if not validate_csrf(request, request.headers.get('X-CSRF-Token', '') or request.cookies.get('csrf', '')):
         return {"ok": False, "error": "Invalid CSRF"}
 
-    user = get_user_from_cookie(request)
+    user = await get_user_from_cookie(request)
     if not require_role(user, 'recruiter'):
         return {"ok": False, "error": "Not authorized"}
 
     # Fetch application and validate ownership
-    application = db.get_application_by_id(application_id)
+    application = await adb.get_application_by_id(application_id)
     if not application:
         return {"ok": False, "error": "Application not found"}
 
@@ -649,7 +716,7 @@ async def api_recruiter_send_email(request: Request):
 
         # If accepted, record status update
         if email_type == 'accept':
-            db.update_application_status(application_id, 'accepted')
+            await adb.update_application_status(application_id, 'accepted')
 
         return {"ok": True, "message": "Email sent successfully"}
     except Exception as e:
@@ -659,7 +726,7 @@ async def api_recruiter_send_email(request: Request):
 @app.post("/chat")
 async def chat_endpoint(request: Request, data: dict):
     prompt = data.get("prompt", "")
-    jobs = db.list_jobs()
+    jobs = await adb.run(job_catalog.all)
     ctx = '\n'.join([f"{j['title']} - Skills: {j.get('skills','')} - Exp: {j.get('experience','')} - JD: {j['description'][:250]}" for j in jobs])
     # If OpenAI key configured, call the Chat API, otherwise return a helpful mocked response.
     if OPENAI_MODEL:
@@ -689,6 +756,19 @@ async def chat_endpoint(request: Request, data: dict):
         )
         return {"answer": fallback}
 
+@app.on_event("startup")
+async def start_scoring_worker():
+    scoring_worker.start()
+    otp_store.start_sweeper()
+
+@app.on_event("shutdown")
+async def shutdown_workers():
+    await scoring_worker.stop()
+    otp_store.stop_sweeper()
+    cpu_pool.shutdown()
+    adb.close()
+    db.close()
+
 # ---------------------- Dev convenience ----------------------
 @app.get("/health")
 async def health():
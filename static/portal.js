@@ -70,6 +70,7 @@
   let intentRole = 'candidate';    // From landing buttons
   let authMode = 'login';          // 'login' or 'signup'
   let jobsCache = [];              // For candidate job list
+  let jobsCursor = null;           // next_cursor of the candidate job list
   let recruiterJobsCache = [];     // For recruiter "My Jobs"
 
   // ---------- Theme Toggle ----------
@@ -475,19 +476,24 @@
   window.submitJobPost = submitJobPost;
 
   // ---------- Candidate Dashboard ----------
-  function applyJobFilters(jobs) {
-    const q = ($('#job-search')?.value || '').toLowerCase();
-    const loc = ($('#job-location')?.value || '').toLowerCase();
+  // Keyword and location search run in the database (/api/jobs?q=&location=)
+  function jobSearchParams(cursor) {
+    const params = new URLSearchParams({ limit: '30' });
+    const q = ($('#job-search')?.value || '').trim();
+    const loc = ($('#job-location')?.value || '').trim();
+    if (q) params.set('q', q);
+    if (loc) params.set('location', loc);
+    if (cursor) params.set('cursor', cursor);
+    return params;
+  }
 
+  function applyJobFilters(jobs) {
     const wantRemote = $('#flt-remote')?.checked;
     const wantOnsite = $('#flt-onsite')?.checked;
     const wantHybrid = $('#flt-hybrid')?.checked;
 
     return jobs.filter((j) => {
-      const text = `${j.title || ''} ${j.description || ''} ${j.skills || ''}`.toLowerCase();
-      if (q && !text.includes(q)) return false;
       const jloc = (j.location || '').toLowerCase();
-      if (loc && loc !== '' && !jloc.includes(loc)) return false;
       // basic location checkboxes
       if (wantRemote && !jloc.includes('remote')) return false;
       if (wantOnsite && !(jloc.includes('on-site') || jloc.includes('onsite'))) return false;
@@ -518,27 +524,34 @@
       cardHTML('Offers', offer);
   }
 
-  async function renderCandidateJobs() {
+  async function renderCandidateJobs(append = false) {
     const container = $('#jobs-list');
     const empty = $('#jobs-empty');
     if (!container || !empty) return;
 
-    container.innerHTML = '';
-    empty.style.display = 'block';
-    container.style.display = 'none';
+    if (!append) {
+      container.innerHTML = '';
+      jobsCache = [];
+      empty.style.display = 'block';
+      container.style.display = 'none';
+    }
+    $('#jobs-more', container)?.remove();
 
+    let page = [];
     try {
-      const resp = await fetch('/api/jobs');
+      const resp = await fetch(`/api/jobs?${jobSearchParams(append ? jobsCursor : null)}`);
       const data = await resp.json();
-      jobsCache = data.ok ? data.jobs || [] : [];
+      page = data.ok ? data.jobs || [] : [];
+      jobsCursor = data.ok ? data.next_cursor : null;
     } catch (e) {
-      jobsCache = [];
+      jobsCursor = null;
       createToast('Failed to load jobs', 'error');
     }
+    jobsCache = jobsCache.concat(page);
 
-    const jobs = applyJobFilters(jobsCache);
+    const jobs = applyJobFilters(page);
 
-    if (!jobs.length) {
+    if (!append && !jobs.length && !jobsCursor) {
       empty.style.display = 'block';
       container.style.display = 'none';
       return;
@@ -547,6 +560,7 @@
     empty.style.display = 'none';
     container.style.display = 'flex';
 
+    const cards = [];
     jobs.forEach((j, index) => {
       const card = document.createElement('div');
       card.className = 'job-card';
@@ -584,9 +598,19 @@
         </div>
       `;
       container.appendChild(card);
+      cards.push(card);
     });
 
-    $$('.apply-now', container).forEach((btn) =>
+    if (jobsCursor) {
+      const more = document.createElement('button');
+      more.id = 'jobs-more';
+      more.className = 'btn btn-ghost';
+      more.textContent = 'Load more jobs';
+      more.addEventListener('click', () => renderCandidateJobs(true));
+      container.appendChild(more);
+    }
+
+    cards.flatMap((card) => $$('.apply-now', card)).forEach((btn) =>
       btn.addEventListener('click', () => {
         const id = btn.getAttribute('data-job-id');
         const title = btn.getAttribute('data-job-title');
@@ -607,7 +631,7 @@
     );
 
     // Add bookmark functionality
-    $$('.job-bookmark', container).forEach((btn) => {
+    cards.flatMap((card) => $$('.job-bookmark', card)).forEach((btn) => {
       btn.addEventListener('click', (e) => {
         e.stopPropagation();
         btn.classList.toggle('bookmarked');
@@ -0,0 +1,116 @@
+import os
+import shutil
+import sys
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+from utils.hashing import file_sha256
+from utils.uploads import save_upload
+
+# Content-addressed resume storage: every distinct file is kept once as
+#   uploads/blobs/<h[0:2]>/<h[2:4]>/<sha256><ext>
+# and applications point at that path, so applying to ten jobs with the same
+# resume stores (and parses) it once and a re-apply never overwrites a file an
+# older application still references. The `blobs` table counts references from
+# applications.resume_path (maintained by triggers); gc() deletes blobs nobody
+# references once they were last stored more than BLOB_GC_GRACE seconds ago,
+# which covers the window between storing an upload and inserting its application.
+
+BLOB_DIR = os.getenv('BLOB_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads', 'blobs'))
+BLOB_GC_GRACE = float(os.getenv('BLOB_GC_GRACE', str(24 * 3600)))
+
+
+class BlobStore:
+    def __init__(self, root: str = BLOB_DIR):
+        self.root = root
+        self.staging = os.path.join(root, 'tmp')
+
+    def path_for(self, digest: str, ext: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + ext.lower())
+
+    def adopt(self, tmp: str, digest: str, ext: str) -> str:
+        """Move a fully written file into place under its hash; drops it if the blob exists."""
+        dest = self.path_for(digest, ext)
+        if os.path.exists(dest):
+            os.unlink(tmp)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(tmp, dest)
+        return dest
+
+    async def put_upload(self, upload, ext: str) -> Tuple[str, str, int]:
+        """Stream an UploadFile into the store; returns (path, sha256, size).
+        Raises utils.uploads.UploadRejected like save_upload."""
+        tmp = os.path.join(self.staging, f'{uuid.uuid4().hex}{ext}')
+        digest = await save_upload(upload, tmp)
+        size = os.path.getsize(tmp)
+        return self.adopt(tmp, digest, ext), digest, size
+
+    def put_file(self, src: str) -> Tuple[str, str, int]:
+        """Copy an existing file into the store."""
+        ext = os.path.splitext(src)[1].lower()
+        digest = file_sha256(src)
+        dest = self.path_for(digest, ext)
+        if not os.path.exists(dest):
+            os.makedirs(self.staging, exist_ok=True)
+            tmp = os.path.join(self.staging, f'{uuid.uuid4().hex}{ext}')
+            shutil.copyfile(src, tmp)
+            self.adopt(tmp, digest, ext)
+        return dest, digest, os.path.getsize(dest)
+
+    def gc(self, db, grace: float = BLOB_GC_GRACE) -> Dict[str, int]:
+        """Delete unreferenced blobs, stray files the table doesn't know and stale staging files."""
+        cutoff = time.time() - grace
+        db.recount_blob_refs()
+        orphans = db.list_orphan_blobs(cutoff)
+        for row in orphans:
+            try:
+                os.unlink(row['path'])
+            except FileNotFoundError:
+                pass
+        db.delete_blobs([row['digest'] for row in orphans])
+        known = db.blob_paths()
+        strays = 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                if path not in known and os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    strays += 1
+        return {'removed': len(orphans), 'strays': strays}
+
+
+def migrate_legacy(db, store: Optional[BlobStore] = None) -> int:
+    """Move resumes stored under the old per-application names into the blob store."""
+    store = store or blob_store
+    moved = 0
+    legacy = set()
+    for app in db.list_all_applications():
+        path = (app['resume_path'] or '').split('::', 1)[0]
+        if not path or path.startswith(store.root) or not os.path.exists(path):
+            continue
+        dest, digest, size = store.put_file(path)
+        with db.transaction():
+            db.register_blob(digest, dest, size)
+            db.update_resume_path(app['id'], dest + app['resume_path'][len(path):])
+        legacy.add(path)
+        moved += 1
+    # Old files go once nothing points at them any more
+    for path in legacy - db.referenced_resume_files():
+        os.unlink(path)
+    return moved
+
+
+blob_store = BlobStore()
+
+
+if __name__ == '__main__':
+    # python -m utils.blob_store gc        -> delete unreferenced blobs
+    # python -m utils.blob_store migrate   -> move old uploads/<user>_job<job> files into the store
+    from database.db_manager import DBManager
+    command = sys.argv[1] if len(sys.argv) > 1 else 'gc'
+    if command == 'migrate':
+        print(f"Moved {migrate_legacy(DBManager())} application resumes into {BLOB_DIR}")
+    else:
+        print(blob_store.gc(DBManager()))
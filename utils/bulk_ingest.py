@@ -0,0 +1,192 @@
+import argparse
+import csv
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bulk import of resumes migrated from another ATS:
+#   python -m utils.bulk_ingest <directory|archive.zip> manifest.csv [--job-id N]
+# The manifest has one row per application with the columns
+#   file,job_id,name,email
+# where file is relative to the directory / zip root (job_id may be left out when
+# --job-id is given). Files are copied into the resume blob store (utils/blob_store.py),
+# parsed in parallel on every core, scored per job in batches and inserted one
+# batch per transaction. Rows whose application already exists are skipped, so an
+# interrupted import is finished by running the same command again.
+
+INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', '500'))
+
+
+class _Source:
+    """Files of a directory or a zip archive, by manifest name."""
+
+    def __init__(self, path: str):
+        self.zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+        self.root = path
+        if self.zip is not None:
+            self.names = {n.replace('\\', '/'): n for n in self.zip.namelist()}
+
+    def open(self, name: str):
+        name = name.replace('\\', '/').lstrip('/')
+        if self.zip is not None:
+            if name not in self.names:
+                raise FileNotFoundError(name)
+            return self.zip.open(self.names[name])
+        full = os.path.realpath(os.path.join(self.root, name))
+        if not full.startswith(os.path.realpath(self.root) + os.sep):
+            raise FileNotFoundError(name)
+        return open(full, 'rb')
+
+
+def _copy_in(source: _Source, name: str) -> Tuple[str, str, int]:
+    """Copy one resume into the blob store, checking type and size; returns (path, sha256, size)."""
+    from utils.blob_store import blob_store
+    from utils.uploads import MAGIC, UPLOAD_MAX_BYTES, UploadRejected, check_extension
+    ext = check_extension(name)
+    os.makedirs(blob_store.staging, exist_ok=True)
+    tmp = os.path.join(blob_store.staging, f'import-{os.getpid()}{ext}')
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with source.open(name) as src, open(tmp, 'wb') as dst:
+            while True:
+                chunk = src.read(1024 * 1024)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(MAGIC[ext][:len(chunk)]):
+                    raise UploadRejected(f"not a {ext[1:].upper()} file")
+                size += len(chunk)
+                if size > UPLOAD_MAX_BYTES:
+                    raise UploadRejected("file too large")
+                digest.update(chunk)
+                dst.write(chunk)
+        return blob_store.adopt(tmp, digest.hexdigest(), ext), digest.hexdigest(), size
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def read_manifest(path: str, default_job: Optional[int]) -> List[Dict[str, Any]]:
+    rows = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            row = {k.strip().lower(): (v or '').strip() for k, v in row.items() if k}
+            job = row.get('job_id') or default_job
+            rows.append({
+                'line': line,
+                'file': row.get('file', ''),
+                'job_id': int(job) if str(job).isdigit() else None,
+                'name': row.get('name', ''),
+                'email': row.get('email', '').lower(),
+            })
+    return rows
+
+
+def ingest(db, source_path: str, manifest: str, default_job: Optional[int] = None,
+           batch_size: int = INGEST_BATCH_SIZE, workers: Optional[int] = None) -> Dict[str, int]:
+    from models.scoring import score_paths
+    from models.talent_index import talent_index
+    from utils.cpu_pool import _init_worker, parse_and_vectorize
+    from utils.hashing import file_sha256
+
+    source = _Source(source_path)
+    rows = read_manifest(manifest, default_job)
+    jobs = {j['id']: j for j in db.list_jobs()}
+    stats = {'rows': len(rows), 'imported': 0, 'already_imported': 0, 'skipped': 0}
+    started = time.monotonic()
+
+    def skip(row, reason):
+        stats['skipped'] += 1
+        print(f"\nline {row['line']}: skipped {row['file'] or '(no file)'}: {reason}", file=sys.stderr)
+
+    # spawn, like utils/cpu_pool: workers must not inherit our sqlite connections
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_worker,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        for start in range(0, len(rows), batch_size):
+            batch, blobs = [], []
+            for row in rows[start:start + batch_size]:
+                if not row['file'] or not row['email'] or row['job_id'] not in jobs:
+                    skip(row, 'missing file/email or unknown job')
+                    continue
+                try:
+                    row['path'], digest, size = _copy_in(source, row['file'])
+                except Exception as e:
+                    skip(row, e)
+                    continue
+                blobs.append((digest, row['path'], size))
+                batch.append(row)
+            db.register_blobs(blobs)
+
+            people = db.get_or_create_candidates([(r['name'], r['email']) for r in batch])
+            todo = []
+            for row in batch:
+                row['candidate_id'] = people.get(row['email'])
+                if row['candidate_id'] is None:
+                    skip(row, 'email belongs to a recruiter account')
+                else:
+                    todo.append(row)
+            done = db.existing_applications([(r['job_id'], r['candidate_id'], r['path']) for r in todo])
+            imported = [r for r in todo if (r['job_id'], r['candidate_id'], r['path']) in done]
+            todo = [r for r in todo if (r['job_id'], r['candidate_id'], r['path']) not in done]
+            stats['already_imported'] += len(imported)
+            # The manifest may repeat a row within one batch; the database can't tell us about those
+            first = {}
+            for row in todo:
+                first.setdefault((row['job_id'], row['candidate_id'], row['path']), row)
+            for row in todo:
+                original = first[(row['job_id'], row['candidate_id'], row['path'])]
+                if original is not row:
+                    skip(row, f"duplicate of line {original['line']}")
+            todo = list(first.values())
+
+            # Parse each distinct file once, across all cores
+            paths = sorted({r['path'] for r in todo})
+            features = dict(zip(paths, pool.map(parse_and_vectorize, paths, chunksize=4)))
+            by_path = {r['path']: r for r in todo}
+            for path, (text, _) in features.items():
+                if text:
+                    owner = by_path[path]
+                    talent_index.add(file_sha256(path), text, {
+                        'candidate_id': owner['candidate_id'], 'candidate_name': owner['name'],
+                        'candidate_email': owner['email'], 'resume_path': path,
+                    })
+
+            inserts = []
+            todo.sort(key=lambda r: r['job_id'])
+            for job_id, group in groupby(todo, key=lambda r: r['job_id']):
+                group = list(group)
+                scores = score_paths(db, jobs[job_id], [r['path'] for r in group], features)
+                inserts.extend({
+                    'job_id': job_id, 'candidate_id': r['candidate_id'], 'candidate_name': r['name'] or r['email'],
+                    'candidate_email': r['email'], 'resume_path': r['path'], 'suitability_score': score,
+                } for r, score in zip(group, scores))
+            db.insert_applications(inserts)
+            stats['imported'] += len(inserts)
+
+            processed = min(start + batch_size, len(rows))
+            rate = processed / max(time.monotonic() - started, 1e-9)
+            print(f"\r[{processed}/{len(rows)}] imported {stats['imported']}, already imported "
+                  f"{stats['already_imported']}, skipped {stats['skipped']} ({rate:.1f} rows/s)",
+                  end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+    return stats
+
+
+if __name__ == '__main__':
+    from database.db_manager import DBManager
+    parser = argparse.ArgumentParser(description='Import resumes from a directory or zip with a CSV manifest')
+    parser.add_argument('source', help='directory or .zip of PDF/DOCX resumes')
+    parser.add_argument('manifest', help='CSV with columns file,job_id,name,email')
+    parser.add_argument('--job-id', type=int, help='job for rows without a job_id')
+    parser.add_argument('--batch-size', type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, help='parser processes (default: all cores)')
+    args = parser.parse_args()
+    result = ingest(DBManager(), args.source, args.manifest, args.job_id, args.batch_size, args.workers)
+    print(', '.join(f'{k}: {v}' for k, v in result.items()))
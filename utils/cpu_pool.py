@@ -0,0 +1,99 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from utils.resume_parser import parse_resume
+
+# Process pool for the CPU-bound apply stages (pdfminer parsing, TF-IDF transforms),
+# so a slow PDF occupies a worker process instead of the event loop.
+#   CPU_POOL_WORKERS      worker processes; 0 runs tasks in a thread instead
+#   CPU_POOL_MAX_PENDING  tasks queued or running before new ones are refused; a task
+#                         counts until it really finishes, even if its caller timed out
+#   CPU_POOL_TIMEOUT      seconds a caller waits for one task
+# A worker that dies (OOM killer, segfault) breaks the whole executor; it is then
+# replaced and the task retried once.
+
+CPU_POOL_WORKERS = int(os.getenv('CPU_POOL_WORKERS', str(max(1, (os.cpu_count() or 2) - 1))))
+CPU_POOL_MAX_PENDING = int(os.getenv('CPU_POOL_MAX_PENDING', '32'))
+CPU_POOL_TIMEOUT = float(os.getenv('CPU_POOL_TIMEOUT', '60'))
+
+
+class PoolBusy(Exception):
+    pass
+
+
+class TaskTimeout(Exception):
+    pass
+
+
+def _init_worker():
+    # Load the fitted matcher once per worker rather than once per task
+    from models.resume_matcher import matcher
+    matcher.load()
+
+
+def parse_and_vectorize(path: str):
+    """Worker task: resume text plus its term counts under the fitted matcher (or None)."""
+    from models.resume_matcher import matcher
+    text = parse_resume(path)
+    counts = matcher.term_counts([text]) if text and matcher.fitted else None
+    return text, counts
+
+
+class CPUPool:
+    def __init__(self, workers: int = CPU_POOL_WORKERS, max_pending: int = CPU_POOL_MAX_PENDING, timeout: float = CPU_POOL_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: workers must not inherit the server's sqlite connections and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        if executor is not None and self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _task_done(self, future: asyncio.Future):
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception()  # retrieved, even when the caller gave up waiting
+
+    async def run(self, fn: Callable, *args: Any, timeout: Optional[float] = None):
+        """Run fn(*args) in a worker. Raises PoolBusy when the queue is full and
+        TaskTimeout when the result does not arrive in time (the worker itself is
+        not interrupted, so the task keeps its slot; extraction has its own limits)."""
+        if self.pending >= self.max_pending:
+            raise PoolBusy("Too many resumes are being processed, try again shortly")
+        for attempt in range(2):
+            executor = self._get_executor() if self.workers > 0 else None
+            try:
+                future = asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+                self.pending += 1
+                future.add_done_callback(self._task_done)
+                # shield: a timeout must not mark the future done while the task still runs
+                return await asyncio.wait_for(asyncio.shield(future), timeout or self.timeout)
+            except asyncio.TimeoutError:
+                raise TaskTimeout("Processing the resume took too long")
+            except BrokenProcessPool:
+                self._discard(executor)
+                if attempt:
+                    raise
+
+    def shutdown(self):
+        self._discard(self._executor)
+
+
+cpu_pool = CPUPool()
@@ -0,0 +1,85 @@
+import os
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+# Streaming DOCX text extraction. Reads word/document.xml plus the header and
+# footer parts straight from the zip with an incremental XML parser, so memory
+# stays flat regardless of document size, and keeps text inside tables (cells
+# separated by tabs, rows by newlines), which python-docx's doc.paragraphs skips.
+
+DOCX_MAX_CHARS = int(os.getenv('DOCX_MAX_CHARS', '200000'))
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+T, TAB, BR, CR, HYPHEN = W + 't', W + 'tab', W + 'br', W + 'cr', W + 'noBreakHyphen'
+P, TC, TR, BODY, HDR, FTR = W + 'p', W + 'tc', W + 'tr', W + 'body', W + 'hdr', W + 'ftr'
+
+_PART_RE = re.compile(r'^word/(header|footer)\d*\.xml$')
+
+
+def _parts(names):
+    # Body first; headers/footers repeat on every page but are stored once
+    yield 'word/document.xml'
+    for name in sorted(names):
+        if _PART_RE.match(name):
+            yield name
+
+
+def _stream_part(fp, out: list, budget: int) -> int:
+    """Append the text of one part to out; returns the characters added."""
+    added = 0
+    depth = 0
+    container = None  # body/hdr/ftr element whose finished children are dropped
+    container_depth = 0
+    in_cell = 0
+    for event, elem in iterparse(fp, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if elem.tag == TC:
+                in_cell += 1
+            elif elem.tag in (BODY, HDR, FTR) and container is None:
+                container, container_depth = elem, depth
+            continue
+        depth -= 1
+        tag = elem.tag
+        piece = None
+        if tag == T:
+            piece = elem.text
+        elif tag == P:
+            # Paragraphs inside a cell stay on the row's line
+            piece = ' ' if in_cell else '\n'
+        elif tag == TC:
+            in_cell -= 1
+            piece = '\t'
+        elif tag == TAB:
+            piece = '\t'
+        elif tag in (BR, CR, TR):
+            piece = '\n'
+        elif tag == HYPHEN:
+            piece = '-'
+        if piece:
+            out.append(piece)
+            added += len(piece)
+            if added >= budget:
+                break
+        # Release each finished top-level block so the tree never holds the whole part
+        if container is not None and depth == container_depth:
+            container.clear()
+    return added
+
+
+def extract_docx(path: str, max_chars: int = DOCX_MAX_CHARS) -> str:
+    out: list = []
+    remaining = max_chars
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        for name in _parts(names):
+            if name not in names or remaining <= 0:
+                continue
+            with zf.open(name) as fp:
+                remaining -= _stream_part(fp, out, remaining)
+            out.append('\n')
+    text = ''.join(out)
+    # Empty paragraphs and cells leave runs of separators behind
+    text = re.sub(r'[ \t]*\n\s*', '\n', text)
+    return text[:max_chars].strip()
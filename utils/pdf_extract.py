@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import NamedTuple, Optional
+
+# Bounded PDF text extraction. pdfminer runs in a separate Python process that
+# is killed after PDF_TIMEOUT seconds, stops after PDF_MAX_PAGES pages or once
+# PDF_MAX_CHARS characters (plenty for scoring) were collected, and on POSIX is
+# capped at PDF_MEMORY_MB of address space. Every call reports an outcome:
+#   ok         whole document extracted
+#   truncated  stopped at the page cap or character budget
+#   timeout    killed at the wall-clock limit (no text)
+#   error      pdfminer failed or the process died (no text)
+
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '30'))
+PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', '100000'))
+PDF_TIMEOUT = float(os.getenv('PDF_TIMEOUT', '20'))
+PDF_MEMORY_MB = int(os.getenv('PDF_MEMORY_MB', '768'))
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+log = logging.getLogger(__name__)
+
+
+class PdfExtraction(NamedTuple):
+    status: str
+    text: str
+    pages: int
+    elapsed: float
+    error: Optional[str] = None
+
+
+def extract_bounded(path: str, max_pages: int = PDF_MAX_PAGES, max_chars: int = PDF_MAX_CHARS):
+    """In-process extraction with the page and character limits; returns (status, text, pages)."""
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LAParams, LTTextContainer
+    # boxes_flow=None skips the costly reading-order analysis; word order within
+    # lines is all TF-IDF needs
+    laparams = LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+    parts, chars, pages = [], 0, 0
+    # One page past the cap tells a long document apart from one that is exactly max_pages
+    for page in extract_pages(path, laparams=laparams, maxpages=max_pages + 1):
+        if pages == max_pages:
+            return 'truncated', ''.join(parts), pages
+        pages += 1
+        for element in page:
+            if isinstance(element, LTTextContainer):
+                text = element.get_text()
+                parts.append(text)
+                chars += len(text)
+        parts.append('\f')
+        if chars >= max_chars:
+            return 'truncated', ''.join(parts)[:max_chars], pages
+    return 'ok', ''.join(parts), pages
+
+
+def _limit_memory(memory_mb: int):
+    # Called in the child itself: preexec_fn is unsafe when the parent runs threads
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def extract_pdf(path: str, timeout: float = PDF_TIMEOUT, max_pages: int = PDF_MAX_PAGES, max_chars: int = PDF_MAX_CHARS) -> PdfExtraction:
+    """Extract a PDF in a killable child process."""
+    start = time.monotonic()
+    cmd = [sys.executable, '-m', 'utils.pdf_extract', os.path.abspath(path), str(max_pages), str(max_chars), str(PDF_MEMORY_MB)]
+    proc = subprocess.Popen(cmd, cwd=ROOT_DIR, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        out, err = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        result = PdfExtraction('timeout', '', 0, time.monotonic() - start, f'killed after {timeout:g}s')
+    else:
+        try:
+            status, text, pages, error = json.loads(out)
+            result = PdfExtraction(status, text, pages, time.monotonic() - start, error)
+        except ValueError:
+            detail = err.decode('utf-8', 'replace').strip().splitlines()
+            result = PdfExtraction('error', '', 0, time.monotonic() - start,
+                                   f'exit code {proc.returncode}: {detail[-1] if detail else "no output"}')
+    if result.status in ('timeout', 'error'):
+        log.warning("pdf extraction %s for %s after %.1fs: %s", result.status, path, result.elapsed, result.error)
+    elif result.status == 'truncated':
+        log.info("pdf extraction truncated for %s at %d pages (%.1fs)", path, result.pages, result.elapsed)
+    return result
+
+
+if __name__ == '__main__':
+    # Child side of extract_pdf: python -m utils.pdf_extract <path> <max_pages> <max_chars> [<memory_mb>]
+    try:
+        if len(sys.argv) > 4 and int(sys.argv[4]) > 0:
+            _limit_memory(int(sys.argv[4]))
+        status, text, pages = extract_bounded(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
+        payload = [status, text, pages, None]
+    except Exception as e:
+        payload = ['error', '', 0, f'{e.__class__.__name__}: {e}']
+    sys.stdout.write(json.dumps(payload))
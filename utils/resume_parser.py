@@ -1,28 +1,73 @@
 import os
-from typing import Optional
+from typing import Optional, Tuple
 from pdfminer.high_level import extract_text as pdf_extract_text
-import docx
 
+from utils.docx_extract import extract_docx
+from utils.hashing import file_sha256
+from utils.pdf_extract import extract_pdf
+from utils.text_cache import TextCache
 
-def extract_text_from_pdf(path: str) -> str:
+# Bump whenever extraction output changes; cached text from older versions is dropped
+PARSER_VERSION = '3'
+# sandboxed: bounded extraction in a killable subprocess (utils/pdf_extract.py)
+# inline: pdfminer's full extract_text in this process, unbounded
+PDF_EXTRACT_MODE = os.getenv('PDF_EXTRACT_MODE', 'sandboxed')
+
+text_cache = TextCache(PARSER_VERSION)
+
+
+def extract_pdf_with_status(path: str) -> Tuple[str, str]:
+    """(text, status) with status as in utils/pdf_extract.py: ok, truncated, timeout or error."""
+    if PDF_EXTRACT_MODE == 'sandboxed':
+        result = extract_pdf(path)
+        return result.text, result.status
     try:
-        return pdf_extract_text(path)
+        return pdf_extract_text(path), 'ok'
     except Exception:
-        return ''
+        return '', 'error'
 
 
-def extract_text_from_docx(path: str) -> str:
+def extract_text_from_pdf(path: str) -> str:
+    return extract_pdf_with_status(path)[0]
+
+
+def extract_docx_with_status(path: str) -> Tuple[str, str]:
     try:
-        doc = docx.Document(path)
-        return '\n'.join(p.text for p in doc.paragraphs)
+        return extract_docx(path), 'ok'
     except Exception:
-        return ''
+        return '', 'error'
 
 
-def parse_resume(path: str) -> str:
+def extract_text_from_docx(path: str) -> str:
+    return extract_docx_with_status(path)[0]
+
+
+def extract_with_status(path: str) -> Tuple[str, str]:
     ext = os.path.splitext(path)[1].lower()
     if ext == '.pdf':
-        return extract_text_from_pdf(path)
+        return extract_pdf_with_status(path)
     elif ext in ('.docx', '.doc'):
-        return extract_text_from_docx(path)
-    return ''
+        return extract_docx_with_status(path)
+    return '', 'ok'
+
+
+def extract_text(path: str) -> str:
+    return extract_with_status(path)[0]
+
+
+def parse_resume(path: str, digest: Optional[str] = None) -> str:
+    """Resume text, served from the parsed-text cache when the same bytes were seen before.
+    Pass digest when the caller already hashed the file."""
+    if not text_cache.enabled or not os.path.exists(path):
+        return extract_text(path)
+    digest = digest or file_sha256(path)
+    text = text_cache.get(digest)
+    if text is None:
+        text, status = extract_with_status(path)
+        if text:
+            text_cache.put(digest, text)
+        elif status in ('timeout', 'error'):
+            # Remembered for TEXT_CACHE_FAILURE_TTL, so a PDF that hits the timeout
+            # doesn't cost the full timeout again on every parse
+            text_cache.put_failure(digest)
+    return text
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+# Extracted resume text, keyed by the SHA-256 of the file bytes and the parser
+# version, zlib-compressed in a SQLite side database. Bumping PARSER_VERSION in
+# utils/resume_parser.py drops every entry made by older parsers on next open.
+# Entries are evicted least-recently-used first once the compressed total
+# exceeds TEXT_CACHE_MAX_MB (0 disables the cache).
+# Each process (server, CPU pool workers) opens its own connection; WAL lets
+# them read while another one writes.
+# Files whose extraction failed (timeout, error) get an empty entry for
+# TEXT_CACHE_FAILURE_TTL seconds, so they aren't re-extracted on every parse.
+
+CACHE_PATH = os.getenv('TEXT_CACHE_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'text_cache.db'))
+CACHE_MAX_BYTES = int(float(os.getenv('TEXT_CACHE_MAX_MB', '256')) * 1024 * 1024)
+# last_used is only rewritten when older than this, so hot entries don't cost a write per hit
+TOUCH_INTERVAL = 3600
+FAILURE_TTL = float(os.getenv('TEXT_CACHE_FAILURE_TTL', '86400'))
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed_text (
+    file_hash TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (file_hash, parser_version)
+);
+CREATE INDEX IF NOT EXISTS idx_parsed_text_last_used ON parsed_text(last_used);
+"""
+
+
+class TextCache:
+    def __init__(self, parser_version: str, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.parser_version = parser_version
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Reopen after a fork; a connection must not cross process boundaries
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(CACHE_SCHEMA)
+            with conn:
+                conn.execute('DELETE FROM parsed_text WHERE parser_version != ?', (self.parser_version,))
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, file_hash: str) -> Optional[str]:
+        """Cached text, '' for a recent failed extraction, None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT body, last_used FROM parsed_text WHERE file_hash = ? AND parser_version = ?',
+                (file_hash, self.parser_version)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if not row[0]:
+                return '' if now - row[1] < FAILURE_TTL else None
+            if now - row[1] > TOUCH_INTERVAL:
+                with conn:
+                    conn.execute(
+                        'UPDATE parsed_text SET last_used = ? WHERE file_hash = ? AND parser_version = ?',
+                        (now, file_hash, self.parser_version)
+                    )
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, file_hash: str, text: str):
+        if not self.enabled:
+            return
+        body = zlib.compress(text.encode('utf-8'), 6)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO parsed_text (file_hash, parser_version, body, size, last_used) VALUES (?,?,?,?,?)',
+                    (file_hash, self.parser_version, body, len(body), time.time())
+                )
+                self._evict(conn)
+
+    def put_failure(self, file_hash: str):
+        """Remember that extracting file_hash failed (empty body, never touched, expires)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO parsed_text (file_hash, parser_version, body, size, last_used) VALUES (?,?,?,0,?)',
+                    (file_hash, self.parser_version, b'', time.time())
+                )
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM parsed_text').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% so eviction doesn't run again on the very next insert
+        excess = total - int(self.max_bytes * 0.9)
+        doomed, freed = [], 0
+        for file_hash, version, size in conn.execute(
+            'SELECT file_hash, parser_version, size FROM parsed_text ORDER BY last_used'
+        ).fetchall():
+            if freed >= excess:
+                break
+            doomed.append((file_hash, version))
+            freed += size
+        conn.executemany('DELETE FROM parsed_text WHERE file_hash = ? AND parser_version = ?', doomed)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute('DELETE FROM parsed_text')
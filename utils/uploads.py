@@ -0,0 +1,67 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+
+# Resume uploads are copied to disk in fixed-size chunks, hashed on the way and
+# only renamed into place once the size and file-type checks pass, so memory per
+# upload stays at one chunk and a rejected or interrupted upload leaves nothing
+# behind in uploads/.
+
+UPLOAD_MAX_BYTES = int(float(os.getenv('UPLOAD_MAX_MB', '10')) * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', str(1024 * 1024)))
+
+# extension -> leading bytes of that format (.docx is a zip, .doc an OLE2 container)
+MAGIC = {
+    '.pdf': b'%PDF-',
+    '.docx': b'PK\x03\x04',
+    '.doc': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+}
+
+
+class UploadRejected(Exception):
+    pass
+
+
+def check_extension(filename: str) -> str:
+    ext = os.path.splitext(filename or '')[1].lower()
+    if ext not in MAGIC:
+        raise UploadRejected("Resume must be a PDF or Word document")
+    return ext
+
+
+async def save_upload(upload, dest: str, max_bytes: int = UPLOAD_MAX_BYTES, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Stream an UploadFile to dest and return the SHA-256 of its bytes.
+    Raises UploadRejected for oversized, empty or mistyped files."""
+    ext = check_extension(dest)
+    directory = os.path.dirname(dest)
+    os.makedirs(directory, exist_ok=True)
+    # Temp file in the destination directory so the final rename is atomic
+    fd, tmp = tempfile.mkstemp(prefix='.upload-', suffix=ext, dir=directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(MAGIC[ext][:len(chunk)]):
+                    raise UploadRejected(f"File content does not look like a {ext[1:].upper()} file")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"Resume is larger than {max_bytes / (1024 * 1024):g} MB")
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+        if size < len(MAGIC[ext]):
+            raise UploadRejected("Uploaded file is empty or truncated")
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    finally:
+        await upload.close()
+    return digest.hexdigest()